@@ -0,0 +1,10 @@
+-- Kitchen Seasonal Content POC - Binary embedding storage
+-- PostgreSQL DDL
+-- Version: 1.1
+--
+-- embedding_json(JSONB) 파싱 비용 제거를 위해 packed float32 바이트 컬럼 추가
+-- 기존 행은 NULL로 남고, 로드 시 embedding_json으로 fallback
+
+ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS embedding_bytea BYTEA;
+
+COMMENT ON COLUMN embeddings.embedding_bytea IS 'Embedding as packed little-endian float32 bytes (dim * 4 bytes)';
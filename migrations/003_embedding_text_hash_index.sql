@@ -0,0 +1,8 @@
+-- Kitchen Seasonal Content POC - Embedding reuse index
+-- PostgreSQL DDL
+-- Version: 1.2
+--
+-- 동일 텍스트(text_hash)의 기존 임베딩 재사용 조회용 인덱스
+-- (generate_embeddings에서 OpenAI 호출 전 text_hash = ANY(...) 조회)
+
+CREATE INDEX IF NOT EXISTS idx_embeddings_text_hash_model ON embeddings(text_hash, model_name);
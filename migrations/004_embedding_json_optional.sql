@@ -0,0 +1,10 @@
+-- Kitchen Seasonal Content POC - Binary-only embedding storage
+-- PostgreSQL DDL
+-- Version: 1.3
+--
+-- embedding_bytea(002)만 저장하고 embedding_json(JSONB 텍스트, 벡터당 수십 KB)은 생략 가능하도록 변경
+-- 기존 행의 embedding_json은 그대로 유지되며, 로드 시 embedding_bytea가 NULL인 행만 사용
+
+ALTER TABLE embeddings ALTER COLUMN embedding_json DROP NOT NULL;
+
+COMMENT ON COLUMN embeddings.embedding_json IS 'Legacy JSON embedding; NULL when embedding_bytea is populated';
@@ -0,0 +1,11 @@
+-- Kitchen Seasonal Content POC - Trigram indexes for keyword matching
+-- PostgreSQL DDL
+-- Version: 1.4
+--
+-- labeling의 GSC/SERP 연관 쿼리 조회(query ILIKE '%keyword%')는 btree 인덱스를 쓰지 못해
+-- 클러스터마다 전체 스캔이 발생하므로 pg_trgm GIN 인덱스 추가
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_raw_gsc_queries_query_trgm ON raw_gsc_queries USING gin (query gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_raw_serp_aio_query_trgm ON raw_serp_aio USING gin (query gin_trgm_ops);
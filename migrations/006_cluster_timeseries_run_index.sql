@@ -0,0 +1,11 @@
+-- Kitchen Seasonal Content POC - cluster_timeseries run lookup index
+-- PostgreSQL DDL
+-- Version: 1.5
+--
+-- 최근 3개월 트렌드 조회(labeling 프롬프트: cluster_id + created_from_run_id ORDER BY month DESC LIMIT 3,
+-- scoring: run 단위 PARTITION BY cluster_id ORDER BY month DESC)는 기존 (cluster_id, month DESC)
+-- 인덱스로는 run 필터 후 정렬이 필요하므로 run 기준 복합 인덱스 추가 (reddit_post_count 포함 → index-only scan)
+
+CREATE INDEX IF NOT EXISTS idx_cluster_timeseries_run_cluster_month
+    ON cluster_timeseries (created_from_run_id, cluster_id, month DESC)
+    INCLUDE (reddit_post_count);
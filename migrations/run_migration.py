@@ -27,8 +27,9 @@ def main():
             print("Please set DATABASE_URL or provide DB_HOST, DB_PASSWORD, etc.")
             sys.exit(1)
     
-    # Get migration file path
-    migration_file = Path(__file__).parent / '001_initial_schema.sql'
+    # Get migration file path (기본값: 001, 인자로 다른 마이그레이션 파일 지정 가능)
+    migration_name = sys.argv[1] if len(sys.argv) > 1 else '001_initial_schema.sql'
+    migration_file = Path(__file__).parent / migration_name
     
     if not migration_file.exists():
         print(f"Error: Migration file not found: {migration_file}")
@@ -105,29 +105,28 @@ class GPTService:
         if not is_openai_available():
             return None
         
-        # Reddit 클러스터링 결과 포맷팅
-        reddit_data = []
+        # Reddit 클러스터링 결과 포맷팅 (조각을 모아 마지막에 한 번만 join)
+        reddit_parts = []
         for cluster in reddit_clusters:
-            cluster_info = f"""
+            reddit_parts.append(f"""
 - Cluster ID: {cluster.get('cluster_id', 'N/A')}
 - Sub Cluster ID: {cluster.get('sub_cluster_id', 'N/A')}
 - Cluster Size: {cluster.get('cluster_size', 0)}
 - Top Keywords: {', '.join(cluster.get('top_keywords', [])[:10])}
 - Summary: {cluster.get('summary', 'N/A')}
-"""
+""")
             # 대표 포스트 요약 추가
             rep_posts = cluster.get('representative_posts', [])
             if rep_posts:
-                cluster_info += "- 대표 포스트:\n"
-                for post in rep_posts[:3]:
-                    title = post.get('title', 'N/A')
-                    cluster_info += f"  * {title}\n"
-            reddit_data.append(cluster_info)
+                reddit_parts.append("- 대표 포스트:\n")
+                reddit_parts.extend(f"  * {post.get('title', 'N/A')}\n" for post in rep_posts[:3])
+            # 클러스터 간 구분자 (기존 "\n".join과 동일한 결과)
+            reddit_parts.append("\n")
         
-        reddit_text = "\n".join(reddit_data) if reddit_data else "Reddit 클러스터링 데이터 없음"
+        reddit_text = "".join(reddit_parts[:-1]) if reddit_parts else "Reddit 클러스터링 데이터 없음"
         
         # SERP 질문형 키워드 포맷팅
-        serp_text = "\n".join([f"- {q}" for q in serp_questions[:100]]) if serp_questions else "SERP 질문형 키워드 없음"
+        serp_text = "\n".join(f"- {q}" for q in serp_questions[:100]) if serp_questions else "SERP 질문형 키워드 없음"
         
         # GPT 프롬프트
         prompt = f"""너는 데이터 기반 콘텐츠 전략가다.
@@ -18,9 +18,29 @@ from common.openai_client import is_openai_available, load_openai_api_key
 from web.db_queries import get_master_topics
 import pandas as pd
 
+# JSON 디코더 (orjson이 있으면 사용, 없으면 표준 json으로 fallback)
+# orjson.JSONDecodeError는 json.JSONDecodeError의 하위 클래스라 기존 예외 처리 그대로 동작
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # 로거 설정
 logger = logging.getLogger(__name__)
 
+# 마스터 토픽 JSON 후보 경로 (import 시 1회만 계산, 올바른 형식의 파일을 우선적으로 찾음)
+_MASTER_TOPICS_FILENAME = "master_topics_final_kr_en_RICH_WHY.json"
+_MASTER_TOPICS_CANDIDATES = tuple(
+    path
+    for root in (
+        Path(__file__).resolve().parent.parent.parent,  # web/views/master_topics.py -> 프로젝트 루트
+        Path("/app"),  # Railway Docker 환경
+        Path.cwd(),  # 현재 작업 디렉토리
+    )
+    for path in (root / "data" / _MASTER_TOPICS_FILENAME, root / _MASTER_TOPICS_FILENAME)
+)
+
 
 def load_master_topics(path: str) -> Optional[Dict]:
     """
@@ -37,9 +57,8 @@ def load_master_topics(path: str) -> Optional[Dict]:
         if not file_path.exists():
             return None
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data
+        # bytes로 바로 읽어 디코딩 (orjson은 str 변환 없이 UTF-8 bytes를 직접 파싱)
+        return _json_loads(file_path.read_bytes())
     except json.JSONDecodeError as e:
         st.error(f"JSON 파싱 오류: {e}")
         return None
@@ -48,6 +67,28 @@ def load_master_topics(path: str) -> Optional[Dict]:
         return None
 
 
+def _parse_json_field(value, default):
+    """
+    DB JSON 필드 파싱 (행마다 호출되므로 모듈 레벨에 한 번만 정의)
+    
+    jsonb 컬럼은 드라이버가 이미 dict/list로 변환하므로 isinstance를 먼저 확인
+    (list에 pd.isna를 적용하면 배열이 반환되어 진리값 판정 오류 발생)
+    """
+    if isinstance(value, (dict, list)):
+        return value
+    if value is None or pd.isna(value):
+        return default
+    if isinstance(value, str):
+        # 빈 문자열은 디코딩 시도 없이 바로 기본값 반환 (예외 경로 회피)
+        if not value.strip():
+            return default
+        try:
+            return _json_loads(value)
+        except ValueError:
+            return default
+    return default
+
+
 def load_master_topics_from_db() -> Optional[Dict]:
     """
     DB에서 마스터 토픽 데이터를 로드하여 JSON 형식으로 변환
@@ -77,30 +118,17 @@ def load_master_topics_from_db() -> Optional[Dict]:
             topics_list = []
             
             for _, row in category_df.iterrows():
-                # JSON 필드 파싱
-                def parse_json_field(value, default):
-                    if pd.isna(value) or value is None:
-                        return default
-                    if isinstance(value, (dict, list)):
-                        return value
-                    if isinstance(value, str):
-                        try:
-                            return json.loads(value)
-                        except:
-                            return default
-                    return default
-                
                 topic = {
                     'topic_title': row.get('topic_title', ''),
                     'primary_question': row.get('primary_question', ''),
-                    'related_questions': parse_json_field(row.get('related_questions_json'), []),
+                    'related_questions': _parse_json_field(row.get('related_questions_json'), []),
                     'score': float(row.get('score', 0)) if pd.notna(row.get('score')) else 0,
                     'evidence_score': row.get('evidence_score'),
-                    'why_now': parse_json_field(row.get('why_now_json'), {}),
+                    'why_now': _parse_json_field(row.get('why_now_json'), {}),
                     'blog_angle': row.get('blog_angle', ''),
                     'social_angle': row.get('social_angle', ''),
-                    'evidence_pack': parse_json_field(row.get('evidence_pack_json'), {}),
-                    'insights': parse_json_field(row.get('insights_json'), {}),
+                    'evidence_pack': _parse_json_field(row.get('evidence_pack_json'), {}),
+                    'insights': _parse_json_field(row.get('insights_json'), {}),
                     'cluster_size': int(row.get('cluster_size', 0)) if pd.notna(row.get('cluster_size')) else 0,
                 }
                 topics_list.append(topic)
@@ -474,33 +502,9 @@ def render_category_section(category_key: str, topics: list):
 
 def render_master_topics():
     """Master Topics 탭 렌더링"""
-    # 프로젝트 루트 경로 (여러 가능한 경로 시도)
-    current_file = Path(__file__)
-    
-    # 가능한 프로젝트 루트 경로들
-    possible_roots = [
-        current_file.parent.parent.parent,  # web/views/master_topics.py -> 프로젝트 루트
-        Path("/app"),  # Railway Docker 환경
-        Path.cwd(),  # 현재 작업 디렉토리
-    ]
-    
-    # JSON 파일 경로 (올바른 형식의 파일을 우선적으로 찾음)
-    possible_paths = []
-    for root in possible_roots:
-        possible_paths.extend([
-            root / "data" / "master_topics_final_kr_en_RICH_WHY.json",
-            root / "master_topics_final_kr_en_RICH_WHY.json",
-        ])
-    
-    # 절대 경로도 시도
-    possible_paths.extend([
-        Path("/app/data/master_topics_final_kr_en_RICH_WHY.json"),
-        Path("/app/master_topics_final_kr_en_RICH_WHY.json"),
-    ])
-    
     # 파일 찾기
     json_path = None
-    for path in possible_paths:
+    for path in _MASTER_TOPICS_CANDIDATES:
         try:
             if path.exists():
                 json_path = str(path)
@@ -548,9 +552,11 @@ def render_master_topics():
                                 st.info(f"📊 topic_qa_briefs 테이블 존재: {table_exists}, 레코드 수: {record_count}")
                             else:
                                 st.warning("⚠️ topic_qa_briefs 테이블이 존재하지 않습니다.")
-                        conn.close()
                     except Exception as e:
                         st.error(f"테이블 확인 중 오류: {e}")
+                    finally:
+                        # 조회 실패 시에도 풀에 연결 반환
+                        conn.close()
                 else:
                     st.error("❌ DB 연결 실패")
             except Exception as e:
@@ -562,7 +568,7 @@ def render_master_topics():
                 st.info("💡 **해결 방법:**")
                 st.info("1. Worker 파이프라인을 실행하여 마스터 토픽 데이터를 생성하세요.")
                 st.info("2. 또는 다음 경로에 JSON 파일을 배치하세요:")
-                for path in possible_paths[:2]:
+                for path in _MASTER_TOPICS_CANDIDATES[:2]:
                     st.text(f"   - {path}")
                 
                 # 빈 상태 UI 표시
@@ -575,7 +581,7 @@ def render_master_topics():
                 st.info("1. DB 연결 상태 확인")
                 st.info("2. topic_qa_briefs 테이블에 데이터가 있는지 확인")
                 st.info("3. 또는 다음 경로에 JSON 파일을 배치해주세요:")
-                for path in possible_paths[:2]:  # 처음 2개만 표시
+                for path in _MASTER_TOPICS_CANDIDATES[:2]:  # 처음 2개만 표시
                     st.text(f"  - {path}")
                 return
         else:
@@ -3,23 +3,35 @@
 
 카테고리별 통계 오버뷰 표시
 """
+import html
 import streamlit as st
 import pandas as pd
-import importlib
-import sys
 
-# 모듈 재로드를 위해 import
 from services import clustering_service
 
-# Streamlit 모듈 캐싱 문제 해결: 모듈 재로드
-if 'services.clustering_service' in sys.modules:
-    importlib.reload(clustering_service)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_category_overview() -> pd.DataFrame:
+    """카테고리별 오버뷰 조회 (60초 캐싱, rerun 시 재집계 방지)"""
+    return clustering_service.get_clustering_service().get_category_overview()
+
+
+def _build_category_table_html(overview_df: pd.DataFrame) -> str:
+    """카테고리별 상세 통계 HTML 테이블 생성"""
+    rows = "".join(
+        # 카테고리 이름을 더 읽기 쉽게 표시
+        f"<tr><td><strong>{html.escape(str(row.category).replace('_', ' ').title())}</strong></td>"
+        f"<td>{int(row.clusters)}개</td><td>{int(row.posts)}개</td><td>{int(row.comments):,}개</td></tr>"
+        for row in overview_df.itertuples(index=False)
+    )
+    return (
+        "<table><tr><th>카테고리</th><th>클러스터</th><th>포스트</th><th>코멘트</th></tr>"
+        f"{rows}</table>"
+    )
 
 
 def render_reddit_collection_status():
     """레딧 수집 및 분석 현황 탭 렌더링"""
-    clustering_service_instance = clustering_service.get_clustering_service()
-    
     try:
         # 카테고리별 오버뷰 조회 (메서드 직접 호출, 예외 처리로 대응)
         import logging
@@ -27,7 +39,7 @@ def render_reddit_collection_status():
         
         try:
             logger.info("Calling get_category_overview...")
-            overview_df = clustering_service_instance.get_category_overview()
+            overview_df = _load_category_overview()
             logger.info(f"get_category_overview returned {len(overview_df)} rows")
             
         except AttributeError as e:
@@ -59,9 +71,10 @@ def render_reddit_collection_status():
         st.markdown("### 📊 카테고리별 통계")
         
         # 전체 통계
-        total_posts = overview_df['posts'].sum()
-        total_comments = overview_df['comments'].sum()
-        total_clusters = overview_df['clusters'].sum()
+        sums = overview_df[['clusters', 'posts', 'comments']].sum()
+        total_clusters = int(sums['clusters'])
+        total_posts = int(sums['posts'])
+        total_comments = int(sums['comments'])
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -78,18 +91,8 @@ def render_reddit_collection_status():
         
         # 카테고리별 상세 통계
         st.markdown("#### 카테고리별 상세")
-        category_cols = st.columns(len(overview_df))
-        
-        for idx, (_, row) in enumerate(overview_df.iterrows()):
-            with category_cols[idx]:
-                category_name = row['category']
-                # 카테고리 이름을 더 읽기 쉽게 표시
-                display_name = category_name.replace('_', ' ').title()
-                
-                st.markdown(f"**{display_name}**")
-                st.metric("클러스터", f"{int(row['clusters'])}개", delta=None)
-                st.metric("포스트", f"{int(row['posts'])}개", delta=None)
-                st.metric("코멘트", f"{int(row['comments']):,}개", delta=None)
+        # 카테고리별 st.metric 위젯 대신 단일 HTML 테이블로 렌더링
+        st.markdown(_build_category_table_html(overview_df), unsafe_allow_html=True)
         
     except Exception as e:
         st.error(f"Error loading reddit collection status: {e}")
@@ -3,8 +3,11 @@ Trend Explorer 뷰
 
 SERP AI Overview / Trend Explorer 표시
 """
+import html
+import io
 import streamlit as st
 import pandas as pd
+from typing import Any, Dict, List
 
 from services.serp_service import get_serp_service
 from web.db_queries import parse_cited_sources
@@ -55,6 +58,81 @@ def generate_channel_summary(lg_count: int, competitor_count: int, earned_count:
     return " ".join(summaries)
 
 
+@st.cache_data(show_spinner=False)
+def _parsed_sources(cited_sources_json: Any) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    cited_sources_json 파싱 및 채널 타입별 분류 (캐싱)
+    
+    동일한 JSON은 rerun / More 클릭 시에도 한 번만 파싱됩니다.
+    """
+    sources = parse_cited_sources(cited_sources_json)
+    buckets = {'lg_owned': [], 'competitor': [], 'earned_media': [], 'other': []}
+    # 한 번의 순회로 채널 타입별 분류 (알 수 없는 타입은 other)
+    for source in sources:
+        buckets.get(source.get('channel_type'), buckets['other']).append(source)
+    buckets['all'] = sources
+    return buckets
+
+
+@st.cache_data(show_spinner=False)
+def _build_serp_csv(df: pd.DataFrame) -> str:
+    """다운로드용 CSV 문자열 생성 (캐싱, rerun마다 재직렬화 방지)"""
+    return df.to_csv(index=False)
+
+
+# 상태 태그 HTML (AVAILABLE / NOT_AVAILABLE 공통 스타일)
+_STATUS_TAG_HTML = "<span style='background-color: #dc3545; color: white; padding: 2px 8px; border-radius: 4px; font-size: 0.8em;'>{label}</span>"
+
+# 채널 그룹 정의: (채널 타입 키, 분포 라벨, 그룹 제목, 링크 태그)
+_CHANNEL_GROUPS = [
+    ('lg_owned', 'LG Owned', '🏠 LG Owned', 'LG Owned'),
+    ('competitor', 'Competitor', '⚔️ Competitor', 'Competitor'),
+    ('earned_media', 'Earned Media', '📰 Earned Media', 'Earned'),
+    ('other', 'Other', '🔗 Other', 'Other'),
+]
+
+
+def _build_sources_html(parsed: Dict[str, List[Dict[str, Any]]]) -> str:
+    """
+    참고 URL 채널 분포 + 채널별 링크 목록을 하나의 HTML 문자열로 생성
+    
+    행마다 수십 개의 st.metric / st.expander / st.caption 호출 대신
+    st.markdown 한 번으로 렌더링하기 위함 (그룹은 <details> 사용)
+    """
+    buf = io.StringIO()
+    buf.write("<p><strong>🔗 참고 URL:</strong></p>")
+    
+    # 채널 분포 통계
+    buf.write("<p><strong>📌 참고 URL 채널 분포</strong></p>")
+    buf.write("<table><tr>")
+    for _, metric_label, _, _ in _CHANNEL_GROUPS:
+        buf.write(f"<th>{metric_label}</th>")
+    buf.write("</tr><tr>")
+    for key, _, _, _ in _CHANNEL_GROUPS:
+        buf.write(f"<td>{len(parsed[key])}</td>")
+    buf.write("</tr></table>")
+    
+    # 카테고리별 <details>로 표시
+    for key, _, group_title, tag in _CHANNEL_GROUPS:
+        group_sources = parsed[key]
+        if not group_sources:
+            continue
+        buf.write(f"<details><summary>{group_title} ({len(group_sources)})</summary><ul>")
+        for source in group_sources:
+            # SERP 응답에 키가 null로 오는 경우가 있어 빈 값은 기본값으로 대체
+            url = html.escape(str(source.get('url') or '#'), quote=True)
+            title = html.escape(str(source.get('title') or source.get('domain') or 'N/A'))
+            snippet = str(source.get('snippet') or '')
+            # 새 탭에서 열리도록 HTML 링크 사용
+            buf.write(f"<li><strong><a href='{url}' target='_blank'>{title}</a></strong> [{tag}]")
+            if snippet:
+                buf.write(f"<br><small>{html.escape(snippet[:150])}...</small>")
+            buf.write("</li>")
+        buf.write("</ul></details>")
+    
+    return buf.getvalue()
+
+
 def render_trend_explorer():
     """구글 AI 검색 결과 분석 탭 렌더링"""
     serp_service = get_serp_service()
@@ -98,110 +176,56 @@ def render_trend_explorer():
         display_count = min(st.session_state.aio_display_count, len(filtered_df))
         display_df = filtered_df.head(display_count)
         
+        # 행별 존재 여부 체크를 루프 밖에서 한 번에 계산 (itertuples 필드명 제약으로 _ 접두사 미사용)
+        display_df = display_df.assign(
+            has_snap=display_df['snapshot_at'].notna(),
+            has_aio=display_df['aio_text'].notna() & (display_df['aio_text'] != ''),
+            is_serp_results=display_df['source_table'] == 'serp_results',
+        )
+        
         # 검색 결과 리스트 (번호와 태그 포함)
-        for list_idx, (df_idx, row) in enumerate(display_df.iterrows(), start=1):
+        for list_idx, row in enumerate(display_df.itertuples(index=False), start=1):
             # 번호와 쿼리 제목
-            expander_title = f"{list_idx}. {row['query']}"
-            if pd.notna(row.get('snapshot_at')):
-                expander_title += f" ({row['snapshot_at']})"
+            expander_title = f"{list_idx}. {row.query}"
+            if row.has_snap:
+                expander_title += f" ({row.snapshot_at})"
             
             # 상태 태그와 함께 표시
             col_tag, col_title = st.columns([1, 9])
             with col_tag:
-                if row['aio_status'] == 'AVAILABLE':
-                    st.markdown(f"<span style='background-color: #dc3545; color: white; padding: 2px 8px; border-radius: 4px; font-size: 0.8em;'>Action required</span>", unsafe_allow_html=True)
-                else:
-                    st.markdown(f"<span style='background-color: #dc3545; color: white; padding: 2px 8px; border-radius: 4px; font-size: 0.8em;'>Not Available</span>", unsafe_allow_html=True)
+                tag_label = "Action required" if row.aio_status == 'AVAILABLE' else "Not Available"
+                st.markdown(_STATUS_TAG_HTML.format(label=tag_label), unsafe_allow_html=True)
             with col_title:
                 with st.expander(expander_title):
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        st.markdown(f"**🔍 Query**: `{row['query']}`")
-                    with col2:
-                        if pd.notna(row.get('snapshot_at')):
-                            st.caption(f"📅 {row['snapshot_at']}")
+                    # 쿼리 / 스냅샷 헤더
+                    header_html = f"<strong>🔍 Query</strong>: <code>{html.escape(str(row.query))}</code>"
+                    if row.has_snap:
+                        header_html += f" &nbsp; <small>📅 {row.snapshot_at}</small>"
+                    st.markdown(header_html, unsafe_allow_html=True)
+                    
+                    # 참고 URL 파싱 (행당 1회, 캐시 사용)
+                    parsed = _parsed_sources(row.cited_sources_json)
+                    sources = parsed['all']
                     
                     # AI Overview 텍스트 또는 검색 결과
-                    if row['aio_status'] == 'AVAILABLE' and row.get('aio_text'):
+                    if row.aio_status == 'AVAILABLE' and row.has_aio:
                         st.markdown("**📄 AI Overview:**")
-                        st.info(row['aio_text'])
-                    elif row.get('source_table') == 'serp_results':
+                        st.info(row.aio_text)
+                    elif row.is_serp_results:
                         st.markdown("**📄 검색 결과:**")
-                        sources = parse_cited_sources(row.get('cited_sources_json'))
                         if sources:
                             st.info(f"총 {len(sources)}개의 검색 결과가 있습니다.")
                     
-                    # 참고 URL (채널 분류)
-                    sources = parse_cited_sources(row.get('cited_sources_json'))
+                    # 참고 URL (채널 분류) - 단일 HTML 블록으로 렌더링
                     if sources:
-                        st.markdown("**🔗 참고 URL:**")
-                        
-                        # 채널 타입별로 분류
-                        lg_sources = [s for s in sources if s.get('channel_type') == 'lg_owned']
-                        competitor_sources = [s for s in sources if s.get('channel_type') == 'competitor']
-                        earned_sources = [s for s in sources if s.get('channel_type') == 'earned_media']
-                        other_sources = [s for s in sources if s.get('channel_type') == 'other']
-                        
-                        # 채널 분포 통계
-                        st.markdown("**📌 참고 URL 채널 분포**")
-                        col1, col2, col3, col4 = st.columns(4)
-                        with col1:
-                            st.metric("LG Owned", len(lg_sources))
-                        with col2:
-                            st.metric("Competitor", len(competitor_sources))
-                        with col3:
-                            st.metric("Earned Media", len(earned_sources))
-                        with col4:
-                            st.metric("Other", len(other_sources))
-                        
-                        # 카테고리별 expander로 표시
-                        if lg_sources:
-                            with st.expander(f"🏠 LG Owned ({len(lg_sources)})", expanded=False):
-                                for source in lg_sources:
-                                    url = source.get('url', '#')
-                                    title = source.get('title', source.get('domain', 'N/A'))
-                                    snippet = source.get('snippet', '')
-                                    # 새 탭에서 열리도록 HTML 링크 사용
-                                    st.markdown(f"- **<a href='{url}' target='_blank'>{title}</a>** [LG Owned]", unsafe_allow_html=True)
-                                    if snippet:
-                                        st.caption(f"  {snippet[:150]}...")
-                        
-                        if competitor_sources:
-                            with st.expander(f"⚔️ Competitor ({len(competitor_sources)})", expanded=False):
-                                for source in competitor_sources:
-                                    url = source.get('url', '#')
-                                    title = source.get('title', source.get('domain', 'N/A'))
-                                    snippet = source.get('snippet', '')
-                                    st.markdown(f"- **<a href='{url}' target='_blank'>{title}</a>** [Competitor]", unsafe_allow_html=True)
-                                    if snippet:
-                                        st.caption(f"  {snippet[:150]}...")
-                        
-                        if earned_sources:
-                            with st.expander(f"📰 Earned Media ({len(earned_sources)})", expanded=False):
-                                for source in earned_sources:
-                                    url = source.get('url', '#')
-                                    title = source.get('title', source.get('domain', 'N/A'))
-                                    snippet = source.get('snippet', '')
-                                    st.markdown(f"- **<a href='{url}' target='_blank'>{title}</a>** [Earned]", unsafe_allow_html=True)
-                                    if snippet:
-                                        st.caption(f"  {snippet[:150]}...")
-                        
-                        if other_sources:
-                            with st.expander(f"🔗 Other ({len(other_sources)})", expanded=False):
-                                for source in other_sources:
-                                    url = source.get('url', '#')
-                                    title = source.get('title', source.get('domain', 'N/A'))
-                                    snippet = source.get('snippet', '')
-                                    st.markdown(f"- **<a href='{url}' target='_blank'>{title}</a>** [Other]", unsafe_allow_html=True)
-                                    if snippet:
-                                        st.caption(f"  {snippet[:150]}...")
+                        st.markdown(_build_sources_html(parsed), unsafe_allow_html=True)
                         
                         # 요약 문구 자동 생성
                         summary_text = generate_channel_summary(
-                            len(lg_sources), 
-                            len(competitor_sources), 
-                            len(earned_sources), 
-                            len(other_sources)
+                            len(parsed['lg_owned']), 
+                            len(parsed['competitor']), 
+                            len(parsed['earned_media']), 
+                            len(parsed['other'])
                         )
                         if summary_text:
                             st.info(f"💡 **LG전자 관점 요약**: {summary_text}")
@@ -222,7 +246,7 @@ def render_trend_explorer():
         
         # CSV 다운로드
         st.markdown("---")
-        csv = filtered_df.to_csv(index=False)
+        csv = _build_serp_csv(filtered_df)
         st.download_button(
             "SERP 데이터 다운로드 (CSV)",
             csv,
@@ -1,94 +1,184 @@
 """
 HDBSCAN clustering and representative sample selection
 """
+import json
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Tuple
 import hdbscan
-from .config import HDBSCAN_MIN_CLUSTER_SIZE, HDBSCAN_MIN_SAMPLES, HDBSCAN_METRIC, REPRESENTATIVE_SAMPLES_K
-from .db import get_db_connection, upsert_cluster_assignment
+from psycopg2.extras import execute_values
+
+# Optional SIMD distance kernels (falls back to NumPy when not installed)
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+from .config import (
+    HDBSCAN_MIN_CLUSTER_SIZE, HDBSCAN_MIN_SAMPLES, HDBSCAN_METRIC, REPRESENTATIVE_SAMPLES_K,
+    EMBEDDING_DIM, EMBEDDING_NORMALIZE, HDBSCAN_CORE_DIST_N_JOBS, HDBSCAN_PCA_COMPONENTS, CLUSTER_WORKERS
+)
+from .db import get_db_connection, put_db_connection, check_embedding_bytea_available
 from .logging import setup_logger
 
 logger = setup_logger("clustering")
 
+# Clustering parameters recorded on every cluster row (serialized once)
+PARAMS_JSON = json.dumps({
+    "min_cluster_size": HDBSCAN_MIN_CLUSTER_SIZE,
+    "min_samples": HDBSCAN_MIN_SAMPLES,
+    "metric": HDBSCAN_METRIC
+})
+
+# Metrics supported by the KD-tree Boruvka MST (avoids the O(N^2) generic path)
+_KDTREE_METRICS = ("euclidean", "l2", "manhattan", "l1", "cityblock", "chebyshev", "minkowski")
+
 def load_embeddings(run_id: int) -> Tuple[List[str], np.ndarray]:
-    """Load embeddings from database"""
+    """Load embeddings from database (streamed into a preallocated float32 array)"""
     conn = get_db_connection()
     doc_ids = []
-    embeddings = []
+    embeddings = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
     
     try:
         with conn.cursor() as cur:
             cur.execute("""
-                SELECT e.doc_id, e.embedding_json
+                SELECT COUNT(*)
+                FROM embeddings e
+                WHERE e.doc_type = 'reddit_post'
+                AND e.created_from_run_id = %s
+            """, (run_id,))
+            n = cur.fetchone()[0]
+        
+        if n == 0:
+            return doc_ids, embeddings
+        
+        embeddings = np.empty((n, EMBEDDING_DIM), dtype=np.float32)
+        
+        # Packed float32 bytes when available; JSONB is only sent for rows without them
+        if check_embedding_bytea_available():
+            select_cols = "e.embedding_bytea, CASE WHEN e.embedding_bytea IS NULL THEN e.embedding_json END"
+        else:
+            select_cols = "NULL, e.embedding_json"
+        
+        # Server-side cursor: rows arrive in itersize chunks instead of one fetchall list
+        with conn.cursor(name="emb_stream") as cur:
+            cur.itersize = 2000
+            cur.execute(f"""
+                SELECT e.doc_id, {select_cols}
                 FROM embeddings e
                 WHERE e.doc_type = 'reddit_post'
                 AND e.created_from_run_id = %s
                 ORDER BY e.doc_id
             """, (run_id,))
             
-            for doc_id, embedding_json in cur.fetchall():
+            for i, (doc_id, embedding_bytes, embedding_json) in enumerate(cur):
+                if i >= n:
+                    break  # rows inserted after COUNT(*) are ignored
                 doc_ids.append(doc_id)
-                embeddings.append(embedding_json)
+                if embedding_bytes is not None:
+                    embeddings[i] = np.frombuffer(embedding_bytes, dtype='<f4')
+                else:
+                    embeddings[i] = embedding_json
     
     finally:
-        conn.close()
+        put_db_connection(conn)
+    
+    # Trim if rows disappeared between COUNT(*) and the streaming read
+    embeddings = embeddings[:len(doc_ids)]
     
-    return doc_ids, np.array(embeddings)
+    if EMBEDDING_NORMALIZE and len(embeddings):
+        # L2-normalize in place; zero vectors are left as-is
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embeddings /= norms
+    
+    return doc_ids, embeddings
 
 def run_clustering(embeddings: np.ndarray) -> Tuple[hdbscan.HDBSCAN, Dict[int, List[int]]]:
     """Run HDBSCAN clustering"""
+    features = embeddings
+    if HDBSCAN_PCA_COMPONENTS and HDBSCAN_PCA_COMPONENTS < min(embeddings.shape):
+        from sklearn.decomposition import PCA
+        features = PCA(n_components=HDBSCAN_PCA_COMPONENTS).fit_transform(embeddings)
+        logger.info(f"Reduced embeddings {embeddings.shape[1]} -> {features.shape[1]} dims for HDBSCAN")
+    
     clusterer = hdbscan.HDBSCAN(
         min_cluster_size=HDBSCAN_MIN_CLUSTER_SIZE,
         min_samples=HDBSCAN_MIN_SAMPLES,
-        metric=HDBSCAN_METRIC
+        metric=HDBSCAN_METRIC,
+        algorithm="boruvka_kdtree" if HDBSCAN_METRIC in _KDTREE_METRICS else "best",
+        core_dist_n_jobs=HDBSCAN_CORE_DIST_N_JOBS,
+        approx_min_span_tree=True,
+        prediction_data=False
     )
     
-    cluster_labels = clusterer.fit_predict(embeddings)
+    cluster_labels = clusterer.fit_predict(features)
     
-    # Group documents by cluster
-    cluster_groups = {}
-    for idx, label in enumerate(cluster_labels):
-        if label not in cluster_groups:
-            cluster_groups[label] = []
-        cluster_groups[label].append(idx)
+    # Group documents by cluster (stable sort keeps doc order within each group)
+    order = np.argsort(cluster_labels, kind='stable')
+    sorted_labels = cluster_labels[order]
+    splits = np.flatnonzero(np.diff(sorted_labels)) + 1
+    labels = sorted_labels[np.r_[0, splits]] if len(order) else sorted_labels
+    cluster_groups = dict(zip(labels.tolist(), (group.tolist() for group in np.split(order, splits))))
     
     return clusterer, cluster_groups
 
-def calculate_centroid(embeddings: np.ndarray, indices: List[int]) -> np.ndarray:
-    """Calculate cluster centroid"""
-    cluster_embeddings = embeddings[indices]
-    return np.mean(cluster_embeddings, axis=0)
+def squared_distances_to_centroid(cluster_embeddings: np.ndarray, centroid: np.ndarray,
+                                  unit_norm: bool = False) -> np.ndarray:
+    """Squared Euclidean distance from each row to the centroid"""
+    if unit_norm:
+        # ||x - c||^2 = 1 + ||c||^2 - 2<x, c> for unit-norm rows: one GEMV, no diff matrix
+        sq_dists = (1.0 + centroid @ centroid) - 2.0 * (cluster_embeddings @ centroid)
+        return np.maximum(sq_dists, 0.0, out=sq_dists)
+    if simsimd is not None:
+        return np.asarray(simsimd.cdist(centroid[None, :], cluster_embeddings, metric="sqeuclidean"))[0]
+    diffs = cluster_embeddings - centroid
+    return np.einsum('ij,ij->i', diffs, diffs)
 
-def find_representative_samples(embeddings: np.ndarray, cluster_indices: List[int], 
-                               centroid: np.ndarray, k: int = REPRESENTATIVE_SAMPLES_K) -> List[int]:
-    """Find k representative samples closest to centroid"""
-    cluster_embeddings = embeddings[cluster_indices]
+def top_k_smallest(values: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k smallest values, smallest first (O(N) argpartition, only k sorted)"""
+    if k < len(values):
+        top_k = np.argpartition(values, k)[:k]
+        return top_k[np.argsort(values[top_k])]
+    return np.argsort(values)
+
+def process_cluster(embeddings: np.ndarray, indices: List[int],
+                    k: int = REPRESENTATIVE_SAMPLES_K) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Centroid, distances and representative samples from a single gather of the cluster block
+    
+    Returns:
+        (centroid, distances aligned with indices, boolean representative mask aligned with indices)
+    """
+    block = embeddings[indices]  # one contiguous gather
+    centroid = np.mean(block, axis=0, dtype=block.dtype)
+    sq_dists = squared_distances_to_centroid(block, centroid, unit_norm=EMBEDDING_NORMALIZE)
     
-    # Calculate distances to centroid
-    distances = np.linalg.norm(cluster_embeddings - centroid, axis=1)
+    is_rep_mask = np.zeros(len(indices), dtype=bool)
+    is_rep_mask[top_k_smallest(sq_dists, k)] = True
     
-    # Get top k closest
-    top_k_indices = np.argsort(distances)[:k]
-    return [cluster_indices[i] for i in top_k_indices]
+    return centroid, np.sqrt(sq_dists), is_rep_mask
 
 def save_clusters(cluster_groups: Dict[int, List[int]], doc_ids: List[str], 
                  embeddings: np.ndarray, clusterer: hdbscan.HDBSCAN, run_id: int) -> Dict[str, Any]:
     """Save clusters and assignments to database"""
-    conn = get_db_connection()
     stats = {
         "clusters_created": 0,
-        "noise_points": 0,
+        "noise_points": len(cluster_groups.get(-1, [])),
         "assignments_created": 0,
         "representative_samples": 0
     }
     
+    # Per-cluster math is independent and NumPy releases the GIL, so run it on a thread pool
+    valid_clusters = [indices for label, indices in cluster_groups.items() if label != -1]  # -1: noise
+    with ThreadPoolExecutor(max_workers=CLUSTER_WORKERS) as executor:
+        results = list(executor.map(lambda indices: process_cluster(embeddings, indices), valid_clusters))
+    
+    # DB writes stay serial on a single connection/transaction
+    conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            for cluster_label, indices in cluster_groups.items():
-                if cluster_label == -1:  # Noise
-                    stats["noise_points"] = len(indices)
-                    continue
-                
+            for indices, (centroid, dists, is_rep_mask) in zip(valid_clusters, results):
                 # Create cluster record
                 cur.execute("""
                     INSERT INTO clusters (
@@ -97,9 +187,7 @@ def save_clusters(cluster_groups: Dict[int, List[int]], doc_ids: List[str],
                     RETURNING cluster_id
                 """, (
                     "HDBSCAN",
-                    '{"min_cluster_size": ' + str(HDBSCAN_MIN_CLUSTER_SIZE) + 
-                    ', "min_samples": ' + str(HDBSCAN_MIN_SAMPLES) + 
-                    ', "metric": "' + HDBSCAN_METRIC + '"}',
+                    PARAMS_JSON,
                     False,
                     len(indices),
                     run_id
@@ -107,35 +195,34 @@ def save_clusters(cluster_groups: Dict[int, List[int]], doc_ids: List[str],
                 cluster_id = cur.fetchone()[0]
                 stats["clusters_created"] += 1
                 
-                # Calculate centroid
-                centroid = calculate_centroid(embeddings, indices)
-                
-                # Find representative samples
-                rep_indices = find_representative_samples(embeddings, indices, centroid)
-                
-                # Save assignments
-                for idx in indices:
-                    doc_id = doc_ids[idx]
-                    distance = np.linalg.norm(embeddings[idx] - centroid)
-                    is_rep = idx in rep_indices
-                    
-                    upsert_cluster_assignment(
-                        cluster_id=cluster_id,
-                        doc_type="reddit_post",
-                        doc_id=doc_id,
-                        distance=distance,
-                        is_representative=is_rep,
-                        run_id=run_id
-                    )
-                    stats["assignments_created"] += 1
-                    
-                    if is_rep:
-                        stats["representative_samples"] += 1
-                
-                conn.commit()
+                # Save assignments (one batched INSERT per cluster)
+                rows = [
+                    (cluster_id, "reddit_post", doc_ids[idx], distance, is_rep, run_id)
+                    for idx, distance, is_rep in zip(indices, dists.tolist(), is_rep_mask.tolist())
+                ]
+                execute_values(cur, """
+                    INSERT INTO cluster_assignments (
+                        cluster_id, doc_type, doc_id, distance_to_centroid,
+                        is_representative, created_from_run_id
+                    ) VALUES %s
+                    ON CONFLICT (doc_type, doc_id, created_from_run_id) DO UPDATE SET
+                        cluster_id = EXCLUDED.cluster_id,
+                        distance_to_centroid = EXCLUDED.distance_to_centroid,
+                        is_representative = EXCLUDED.is_representative,
+                        updated_at = CURRENT_TIMESTAMP
+                """, rows, page_size=1000)
+                stats["assignments_created"] += len(rows)
+                stats["representative_samples"] += int(is_rep_mask.sum())
+        
+        # Single commit for all clusters and assignments
+        conn.commit()
+    
+    except Exception:
+        conn.rollback()
+        raise
     
     finally:
-        conn.close()
+        put_db_connection(conn)
     
     return stats
 
@@ -155,6 +242,9 @@ def run_clustering_pipeline(run_id: int, dry_run: bool = False) -> Dict[str, Any
         logger.warning("No embeddings found, skipping clustering")
         return {"clusters_created": 0, "noise_points": 0}
     
+    # C-contiguous float32 once, so row gathers and BLAS calls never copy in/upcast
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    
     # Run clustering
     clusterer, cluster_groups = run_clustering(embeddings)
     logger.info(f"Clustering completed: {len(cluster_groups)} groups (including noise)")
@@ -2,10 +2,10 @@
 SERP AI Overview collection via SerpAPI
 """
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any
 from serpapi import GoogleSearch
-from .config import REDDIT_KEYWORDS
+from .config import SAMPLE_SERP_KEYWORDS, SERP_COLLECT_WORKERS
 from .db import upsert_serp_aio
 from .logging import setup_logger
 
@@ -26,54 +26,55 @@ def collect_serp_aio(run_id: int, dry_run: bool = False) -> Dict[str, Any]:
     }
     
     # Collect top keywords from each category
-    sample_keywords = []
-    for category, keywords in REDDIT_KEYWORDS.items():
-        sample_keywords.extend(keywords[:2])  # Top 2 from each category
+    sample_keywords = SAMPLE_SERP_KEYWORDS
     
     logger.info(f"Starting SERP AIO collection for {len(sample_keywords)} keywords")
     
-    for keyword in sample_keywords:
-        try:
-            logger.info(f"Collecting SERP AIO for keyword: {keyword}")
-            
-            if dry_run:
-                logger.info(f"[DRY RUN] Would query SerpAPI for '{keyword}'")
-                stats["queries_processed"] += 1
-                continue
-            
-            params = {
-                "q": keyword,
-                "api_key": serpapi_key,
-                "engine": "google",
-                "hl": "en",
-                "gl": "us"
-            }
-            
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            
-            # Check for AI Overview
-            aio_data = {}
-            if "ai_overview" in results:
-                aio_data = {
-                    "aio_text": results["ai_overview"].get("text", ""),
-                    "cited_sources": results["ai_overview"].get("cited_sources", []),
-                    "locale": "en-US"
-                }
-                upsert_serp_aio(keyword, aio_data, run_id)
-                stats["aio_found"] += 1
-                logger.info(f"Found AI Overview for '{keyword}'")
-            else:
-                logger.info(f"No AI Overview found for '{keyword}'")
-            
+    if dry_run:
+        for keyword in sample_keywords:
+            logger.info(f"[DRY RUN] Would query SerpAPI for '{keyword}'")
             stats["queries_processed"] += 1
+        return stats
+    
+    def _fetch(keyword: str) -> Dict[str, Any]:
+        """Query SerpAPI for one keyword (runs on a worker thread)"""
+        logger.info(f"Collecting SERP AIO for keyword: {keyword}")
+        params = {
+            "q": keyword,
+            "api_key": serpapi_key,
+            "engine": "google",
+            "hl": "en",
+            "gl": "us"
+        }
+        return GoogleSearch(params).get_dict()
+    
+    # Network-bound: keep up to SERP_COLLECT_WORKERS requests in flight
+    with ThreadPoolExecutor(max_workers=SERP_COLLECT_WORKERS) as executor:
+        futures = {executor.submit(_fetch, keyword): keyword for keyword in sample_keywords}
+        for future in as_completed(futures):
+            keyword = futures[future]
+            try:
+                results = future.result()
+                
+                # Check for AI Overview
+                aio_data = {}
+                if "ai_overview" in results:
+                    aio_data = {
+                        "aio_text": results["ai_overview"].get("text", ""),
+                        "cited_sources": results["ai_overview"].get("cited_sources", []),
+                        "locale": "en-US"
+                    }
+                    upsert_serp_aio(keyword, aio_data, run_id)
+                    stats["aio_found"] += 1
+                    logger.info(f"Found AI Overview for '{keyword}'")
+                else:
+                    logger.info(f"No AI Overview found for '{keyword}'")
+                
+                stats["queries_processed"] += 1
             
-            # Rate limiting
-            time.sleep(1)
-        
-        except Exception as e:
-            logger.error(f"Error collecting SERP AIO for keyword '{keyword}': {e}")
-            stats["errors"].append(str(e))
+            except Exception as e:
+                logger.error(f"Error collecting SERP AIO for keyword '{keyword}': {e}")
+                stats["errors"].append(str(e))
     
     logger.info(f"SERP AIO collection completed: {stats['aio_found']} AIO found")
     return stats
@@ -4,26 +4,37 @@ Pipeline configuration constants
 # Collection limits
 MAX_POSTS_PER_KEYWORD = 1000
 TOP_COMMENTS_PER_POST = 3
+REDDIT_COLLECT_WORKERS = 8  # 동시에 실행할 Apify actor 수 (워커당 DB 연결 1개 - all 모드에서 SERP/GSC 적재 연결 각 1개와 합쳐 DB_POOL_MAX 이하로 유지)
+SERP_COLLECT_WORKERS = 10  # 동시에 보낼 SerpAPI 요청 수 (API 호출만 병렬, DB 저장은 호출 스레드의 연결 1개)
 REPRESENTATIVE_SAMPLES_K = 5
 MAX_BRIEFS_TO_GENERATE = 50
 
 # Embedding settings
 EMBEDDING_MODEL = "text-embedding-3-large"
 EMBEDDING_DIM = 3072  # text-embedding-3-large default dimension
+EMBEDDING_NORMALIZE = True  # 로드 시 L2 정규화 (euclidean 순위 = cosine 순위, 거리 계산이 내적 하나로 축소)
+EMBED_CONCURRENCY = 16  # 동시에 보낼 임베딩 API 요청 수
+EMBEDDING_BATCH_SIZE = 128  # 임베딩 API 요청 1회당 입력 텍스트 수
 
 # Clustering settings
 HDBSCAN_MIN_CLUSTER_SIZE = 5
 HDBSCAN_MIN_SAMPLES = 3
 HDBSCAN_METRIC = "euclidean"
+HDBSCAN_CORE_DIST_N_JOBS = -1  # core distance 계산 병렬화 (-1: 전체 CPU)
+HDBSCAN_PCA_COMPONENTS = None  # 설정 시 HDBSCAN 전에 PCA로 차원 축소 (예: 50, KD-tree 효율 회복)
+CLUSTER_WORKERS = None  # 클러스터별 centroid/거리 계산 스레드 수 (None: ThreadPoolExecutor 기본값)
 
 # LLM settings
 LLM_MODEL = "gpt-4o-mini"
 LLM_MODEL_VERSION = "1.0"
 LLM_MAX_RETRIES = 2
 LLM_TEMPERATURE = 0.3
+LLM_CONCURRENCY = 8  # 동시에 생성할 brief 그룹 수 (그룹당 조회/저장 시에만 DB 연결 사용, DB_POOL_MAX 이하로 유지)
+LLM_BRIEFS_PER_CALL = 4  # LLM 호출 1회당 묶어서 생성할 클러스터 brief 수 (1이면 클러스터별 호출)
 
 # Keywords extraction
 TOP_KEYWORDS_COUNT = 15
+TFIDF_HASH_FEATURES = 2 ** 18  # 전체 클러스터 공통 TF-IDF 해시 공간 크기 (어휘 dict 없이 MurmurHash3로 인덱싱)
 
 # Timeseries
 TIMESERIES_MONTHS_BACK = 12  # Last 12 months
@@ -63,3 +74,7 @@ REDDIT_KEYWORDS = {
         "meal prep vegetables", "vegetable handling"
     ]
 }
+
+# Flattened keyword lists (computed once at import)
+ALL_REDDIT_KEYWORDS = tuple(kw for kws in REDDIT_KEYWORDS.values() for kw in kws)
+SAMPLE_SERP_KEYWORDS = tuple(kw for kws in REDDIT_KEYWORDS.values() for kw in kws[:2])  # Top 2 from each category
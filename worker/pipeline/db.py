@@ -1,81 +1,144 @@
 """
 Database connection and helper functions
 
-pgvector 자동 감지 및 분기 처리 포함
+embeddings 컬럼(embedding_bytea, embedding_json NULL 허용) 자동 감지 및 분기 처리 포함
 """
 import psycopg2
 import json
-from psycopg2.extras import execute_values, execute_batch, Json
+import array
+import io
+import sys
+from psycopg2.extras import execute_values, Json, register_default_json, register_default_jsonb
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from psycopg2 import pool
 from typing import Optional, Dict, Any, List
 import os
+import random
 import threading
 import time
-from functools import wraps
-from datetime import datetime
+from contextlib import contextmanager
+from functools import wraps, lru_cache
+from datetime import date, datetime
 from .logging import setup_logger
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # json/jsonb 컬럼 결과(json_agg 등) 디코딩도 orjson 사용 (전역 typecaster)
+    register_default_json(globally=True, loads=orjson.loads)
+    register_default_jsonb(globally=True, loads=orjson.loads)
+
 logger = setup_logger("db")
 
-# pgvector 사용 가능 여부 캐시
-_pgvector_available = None
+# embeddings.embedding_bytea 컬럼 존재 여부 캐시 (migrations/002)
+_embedding_bytea_available = None
+
+# embeddings.embedding_json NULL 허용 여부 캐시 (migrations/004)
+_embedding_json_optional = None
+
+# Connection pool (동시 워커 수에 맞게 환경 변수로 조정)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "5"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))
+
+# 세션 타임아웃 (ms, 0이면 미설정) - 물리 연결 생성 시 한 번만 적용
+# statement_timeout은 COPY 병합/클러스터 저장/점수 UPDATE 같은 대량 단계가 30초를 넘길 수 있어 기본 비활성
+# idle_in_transaction은 SELECT 후 LLM/임베딩 API 호출 동안 트랜잭션을 열어두는 단계가 있어 기본 비활성
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+DB_LOCK_TIMEOUT_MS = int(os.getenv("DB_LOCK_TIMEOUT_MS", "5000"))
+DB_IDLE_IN_TX_TIMEOUT_MS = int(os.getenv("DB_IDLE_IN_TX_TIMEOUT_MS", "0"))
 
-# Connection pool
+# PgBouncer transaction pooling 경유 여부 - 트랜잭션마다 백엔드가 바뀌므로
+# 세션 단위 기능(startup options)을 사용하지 않음
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "").lower() in ("1", "true", "yes")
 _connection_pool = None
 _pool_lock = threading.Lock()
 
+@lru_cache(maxsize=1)
+def _resolve_database_url() -> str:
+    """
+    DATABASE_URL 해석 + Railway SSL 설정 (프로세스당 1회만 계산)
+    
+    풀 생성과 직접 연결 fallback이 같은 DSN을 사용
+    """
+    database_url = (
+        os.getenv("DATABASE_URL") or 
+        os.getenv("RAILWAY_DATABASE_URL") or
+        os.getenv("POSTGRES_URL") or
+        os.getenv("POSTGRES_PRIVATE_URL")
+    )
+    if not database_url:
+        raise ValueError("DATABASE_URL not found in environment variables")
+    
+    # Railway PostgreSQL SSL 설정 강화
+    # Railway URL 패턴: *.railway.app, *.proxy.rlwy.net, *.up.railway.app
+    is_railway = any(pattern in database_url.lower() for pattern in [
+        'railway.app', 'rlwy.net', 'up.railway.app'
+    ])
+    
+    if is_railway:
+        # SSL 모드 확인 및 추가
+        if 'sslmode' not in database_url.lower():
+            separator = '&' if '?' in database_url else '?'
+            database_url = f"{database_url}{separator}sslmode=require"
+            logger.info("Added sslmode=require to Railway database URL")
+        elif 'sslmode=disable' in database_url.lower():
+            # sslmode=disable이면 require로 변경
+            database_url = database_url.replace('sslmode=disable', 'sslmode=require')
+            logger.warning("Changed sslmode from disable to require for Railway")
+    
+    return database_url
+
+def _session_options() -> str:
+    """
+    libpq options 문자열 생성 (연결 시작 시 서버에 전달되어 별도 SET 왕복 없음)
+    
+    PgBouncer는 options startup 파라미터를 거부하므로 DB_PGBOUNCER면 빈 문자열
+    (타임아웃은 ALTER ROLE ... SET으로 DB 역할에 지정)
+    """
+    if DB_PGBOUNCER:
+        return ""
+    settings = (
+        ("statement_timeout", DB_STATEMENT_TIMEOUT_MS),
+        ("lock_timeout", DB_LOCK_TIMEOUT_MS),
+        ("idle_in_transaction_session_timeout", DB_IDLE_IN_TX_TIMEOUT_MS),
+    )
+    return " ".join(f"-c {name}={value}" for name, value in settings if value > 0)
+
 def get_connection_pool():
     """Get or create connection pool"""
     global _connection_pool
-    if _connection_pool is None:
-        with _pool_lock:
-            if _connection_pool is None:
-                database_url = (
-                    os.getenv("DATABASE_URL") or 
-                    os.getenv("RAILWAY_DATABASE_URL") or
-                    os.getenv("POSTGRES_URL") or
-                    os.getenv("POSTGRES_PRIVATE_URL")
+    pool_ = _connection_pool
+    if pool_ is not None:
+        return pool_
+    
+    with _pool_lock:
+        # 락 안에서 다시 확인 (다른 스레드가 먼저 생성했을 수 있음)
+        if _connection_pool is None:
+            database_url = _resolve_database_url()
+            
+            # 연결 테스트를 위한 로그 (민감 정보 마스킹)
+            url_masked = database_url.split('@')[-1] if '@' in database_url else database_url[:50]
+            logger.info(f"Connecting to database: ...@{url_masked}")
+            logger.debug(f"SSL mode: {'sslmode' in database_url.lower()}")
+            
+            try:
+                # Connection pool 생성 (DB_POOL_MIN ~ DB_POOL_MAX)
+                _connection_pool = psycopg2.pool.ThreadedConnectionPool(
+                    minconn=DB_POOL_MIN,
+                    maxconn=DB_POOL_MAX,
+                    dsn=database_url,
+                    connect_timeout=10,  # 연결 타임아웃 10초
+                    options=_session_options()
                 )
-                if not database_url:
-                    raise ValueError("DATABASE_URL not found in environment variables")
-                
-                # Railway PostgreSQL SSL 설정 강화
-                # Railway URL 패턴: *.railway.app, *.proxy.rlwy.net, *.up.railway.app
-                is_railway = any(pattern in database_url.lower() for pattern in [
-                    'railway.app', 'rlwy.net', 'up.railway.app'
-                ])
-                
-                if is_railway:
-                    # SSL 모드 확인 및 추가
-                    if 'sslmode' not in database_url.lower():
-                        separator = '&' if '?' in database_url else '?'
-                        database_url = f"{database_url}{separator}sslmode=require"
-                        logger.info("Added sslmode=require to Railway database URL")
-                    elif 'sslmode=disable' in database_url.lower():
-                        # sslmode=disable이면 require로 변경
-                        database_url = database_url.replace('sslmode=disable', 'sslmode=require')
-                        logger.warning("Changed sslmode from disable to require for Railway")
-                
-                # 연결 테스트를 위한 로그 (민감 정보 마스킹)
-                url_masked = database_url.split('@')[-1] if '@' in database_url else database_url[:50]
-                logger.info(f"Connecting to database: ...@{url_masked}")
-                logger.debug(f"SSL mode: {'sslmode' in database_url.lower()}")
-                
-                try:
-                    # Connection pool 생성 (min 2, max 10)
-                    _connection_pool = psycopg2.pool.ThreadedConnectionPool(
-                        minconn=2,
-                        maxconn=10,
-                        dsn=database_url,
-                        connect_timeout=10  # 연결 타임아웃 10초
-                    )
-                    logger.info("Connection pool created successfully")
-                except Exception as e:
-                    logger.error(f"Failed to create connection pool: {e}")
-                    logger.error(f"Database URL pattern: {url_masked}")
-                    raise
-    return _connection_pool
+                logger.info(f"Connection pool created successfully (min={DB_POOL_MIN}, max={DB_POOL_MAX})")
+            except Exception as e:
+                logger.error(f"Failed to create connection pool: {e}")
+                logger.error(f"Database URL pattern: {url_masked}")
+                raise
+        return _connection_pool
 
 def get_db_connection():
     """Get database connection from pool"""
@@ -84,26 +147,43 @@ def get_db_connection():
         conn = pool.getconn()
         return conn
     except Exception as e:
-        logger.error(f"Failed to get connection from pool: {e}")
-        # Fallback: 직접 연결 (SSL 설정 포함)
-        database_url = (
-            os.getenv("DATABASE_URL") or 
-            os.getenv("RAILWAY_DATABASE_URL") or
-            os.getenv("POSTGRES_URL") or
-            os.getenv("POSTGRES_PRIVATE_URL")
-        )
-        if not database_url:
-            raise ValueError("DATABASE_URL not found in environment variables")
-        
-        # Railway SSL 설정 (fallback에도 적용)
-        is_railway = any(pattern in database_url.lower() for pattern in [
-            'railway.app', 'rlwy.net', 'up.railway.app'
-        ])
-        if is_railway and 'sslmode' not in database_url.lower():
-            separator = '&' if '?' in database_url else '?'
-            database_url = f"{database_url}{separator}sslmode=require"
-        
-        return psycopg2.connect(database_url, connect_timeout=10)
+        # 풀 밖의 직접 연결로 대체하지 않음 (연결 누수 및 풀 고갈 은폐 방지)
+        logger.error(f"Failed to get connection from pool: {e} (stats: {get_pool_stats()})")
+        raise
+
+@contextmanager
+def pooled_conn():
+    """풀 연결 컨텍스트 매니저 (예외 시 롤백, 종료 시 풀에 반환 - 커밋은 호출자가 수행)"""
+    conn = get_db_connection()
+    try:
+        yield conn
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        put_db_connection(conn)
+
+def close_connection_pool():
+    """프로세스 종료 전 풀의 모든 연결 정리 (파이프라인 실행 단위로 한 번 호출)"""
+    global _connection_pool
+    with _pool_lock:
+        pool_ = _connection_pool
+        _connection_pool = None
+    if pool_ is not None:
+        logger.info(f"Closing connection pool (in_use={len(pool_._used)}, idle={len(pool_._pool)})")
+        pool_.closeall()
+
+def get_pool_stats() -> Dict[str, int]:
+    """연결 풀 사용 현황 (모니터링용)"""
+    pool_ = _connection_pool
+    if pool_ is None:
+        return {"min": DB_POOL_MIN, "max": DB_POOL_MAX, "in_use": 0, "idle": 0}
+    return {
+        "min": pool_.minconn,
+        "max": pool_.maxconn,
+        "in_use": len(pool_._used),
+        "idle": len(pool_._pool),
+    }
 
 def put_db_connection(conn):
     """Return connection to pool"""
@@ -117,20 +197,39 @@ def put_db_connection(conn):
         except:
             pass
 
-def retry_db_operation(max_retries=3, backoff=1.0):
-    """데이터베이스 작업 재시도 데코레이터"""
+# 재시도 대상 SQLSTATE 클래스: 08 연결 예외, 40 트랜잭션 롤백(직렬화 실패/교착), 53 리소스 부족, 57 운영자 개입
+_TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57")
+# 개별 코드: 55P03 lock_not_available (lock_timeout 초과)
+_TRANSIENT_SQLSTATES = ("55P03",)
+
+def _is_transient_db_error(e: Exception) -> bool:
+    """일시적 오류 여부 (IntegrityError/DataError 등 영구 오류는 재시도해도 동일하게 실패)"""
+    pgcode = getattr(e, 'pgcode', None)
+    if pgcode:
+        return pgcode[:2] in _TRANSIENT_SQLSTATE_CLASSES or pgcode in _TRANSIENT_SQLSTATES
+    # 서버 응답 없이 끊긴 연결 등은 pgcode 없이 OperationalError/InterfaceError로 전달됨
+    return isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+
+def retry_db_operation(max_retries=3, backoff=1.0, max_delay=30.0):
+    """데이터베이스 작업 재시도 데코레이터 (지수 백오프 + jitter)"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            # 호출자가 연결/트랜잭션을 관리하는 경우 재시도하면 이전 작업이 유실되므로 그대로 실행
+            if kwargs.get('conn') is not None:
+                return func(*args, **kwargs)
             last_exception = None
             for attempt in range(max_retries):
                 try:
                     return func(*args, **kwargs)
-                except (psycopg2.OperationalError, psycopg2.InterfaceError, psycopg2.DatabaseError) as e:
+                except psycopg2.Error as e:
+                    if not _is_transient_db_error(e):
+                        raise
                     last_exception = e
                     if attempt < max_retries - 1:
-                        wait_time = backoff * (2 ** attempt)
-                        logger.warning(f"DB operation failed (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {wait_time}s...")
+                        # 워커들이 동시에 재시도하지 않도록 0.5~1.5배 jitter 적용
+                        wait_time = min(backoff * (2 ** attempt) * (0.5 + random.random()), max_delay)
+                        logger.warning(f"DB operation failed (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {wait_time:.2f}s...")
                         time.sleep(wait_time)
                     else:
                         logger.error(f"DB operation failed after {max_retries} attempts: {e}")
@@ -142,39 +241,128 @@ def retry_db_operation(max_retries=3, backoff=1.0):
         return wrapper
     return decorator
 
-def check_pgvector_available() -> bool:
+def check_embedding_bytea_available() -> bool:
     """
-    pgvector extension 사용 가능 여부 확인
+    embeddings.embedding_bytea 컬럼 존재 여부 확인 (002 마이그레이션 적용 여부)
     
     Returns:
-        True if pgvector is available, False otherwise
+        True if the binary embedding column exists, False otherwise
     """
-    global _pgvector_available
-    if _pgvector_available is not None:
-        return _pgvector_available
+    global _embedding_bytea_available
+    if _embedding_bytea_available is not None:
+        return _embedding_bytea_available
     
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            # Check if vector type exists
             cur.execute("""
                 SELECT EXISTS (
-                    SELECT 1 FROM pg_type WHERE typname = 'vector'
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'embeddings' AND column_name = 'embedding_bytea'
                 )
             """)
-            _pgvector_available = cur.fetchone()[0]
-            return _pgvector_available
+            _embedding_bytea_available = cur.fetchone()[0]
+            return _embedding_bytea_available
     except Exception as e:
-        # If check fails, assume pgvector is not available
-        _pgvector_available = False
+        _embedding_bytea_available = False
         return False
     finally:
-        conn.close()
+        put_db_connection(conn)
 
-def create_pipeline_run(run_type: str, status: str = "running") -> int:
-    """Create a new pipeline run and return run_id"""
+def check_embedding_json_optional() -> bool:
+    """
+    embeddings.embedding_json이 NULL 허용인지 확인 (004 마이그레이션 적용 여부)
+    
+    Returns:
+        True if embeddings can be stored as bytea only, False otherwise
+    """
+    global _embedding_json_optional
+    if _embedding_json_optional is not None:
+        return _embedding_json_optional
+    
     conn = get_db_connection()
     try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'embeddings' AND column_name = 'embedding_json'
+                    AND is_nullable = 'YES'
+                )
+            """)
+            _embedding_json_optional = cur.fetchone()[0]
+            return _embedding_json_optional
+    except Exception as e:
+        _embedding_json_optional = False
+        return False
+    finally:
+        put_db_connection(conn)
+
+def _dumps_json(obj: Any) -> str:
+    """JSONB 값 직렬화 (orjson 설치 시 C 구현 사용, 실패 시 표준 json으로 대체)"""
+    if orjson is not None:
+        try:
+            # numpy 배열/스칼라(클러스터링 메타데이터 등)도 변환 없이 직렬화
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj)
+
+def _truncate(data: Dict[str, Any], key: str, limit: int, default: str = '',
+              empty_none: bool = False) -> Optional[str]:
+    """문자열 필드 정규화: 기본값 대체 후 길이 제한 (empty_none이면 빈 문자열은 None)"""
+    value = (data.get(key) or default)[:limit]
+    return value if value or not empty_none else None
+
+# raw_json 저장 시 컬럼과 같은 길이로 잘라낼 본문 필드
+_POST_JSON_TEXT_LIMITS = (('selftext', 50000), ('title', 10000))
+
+def _prune_post_json(post_data: Dict[str, Any]) -> Dict[str, Any]:
+    """raw_json용 post_data (제한 길이를 넘는 필드만 자른 사본, 해당 없으면 원본 그대로)"""
+    pruned = None
+    for key, limit in _POST_JSON_TEXT_LIMITS:
+        value = post_data.get(key)
+        if isinstance(value, str) and len(value) > limit:
+            if pruned is None:
+                pruned = dict(post_data)
+            pruned[key] = value[:limit]
+    return pruned if pruned is not None else post_data
+
+def _reddit_post_row(post_data: Dict[str, Any], post_id: str, created_utc: int, raw_json: Any) -> tuple:
+    """raw_reddit_posts INSERT 파라미터 튜플 생성 (단건/배치 공통)"""
+    return (
+        post_id,
+        _truncate(post_data, 'subreddit', 100, 'unknown'),
+        _truncate(post_data, 'title', 10000, 'Untitled'),
+        _truncate(post_data, 'selftext', 50000, empty_none=True),
+        _truncate(post_data, 'author', 100, empty_none=True),
+        created_utc,
+        max(0, int(post_data.get('ups', 0))),
+        max(0, int(post_data.get('num_comments', 0))),
+        _truncate(post_data, 'permalink', 5000, empty_none=True),
+        _truncate(post_data, 'url', 5000, empty_none=True),
+        _truncate(post_data, 'keyword', 200),
+        raw_json
+    )
+
+def pack_embedding(embedding: List[float]) -> bytes:
+    """Embedding을 little-endian float32 바이트로 변환 (embedding_bytea 저장용)"""
+    packed = array.array('f', embedding)
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    return packed.tobytes()
+
+def unpack_embedding(data: bytes) -> List[float]:
+    """embedding_bytea(little-endian float32 바이트)를 float 리스트로 변환"""
+    unpacked = array.array('f')
+    unpacked.frombytes(bytes(data))
+    if sys.byteorder != 'little':
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+def create_pipeline_run(run_type: str, status: str = "running") -> int:
+    """Create a new pipeline run and return run_id"""
+    with pooled_conn() as conn:
         with conn.cursor() as cur:
             cur.execute("""
                 INSERT INTO pipeline_runs (run_type, status, started_at)
@@ -182,88 +370,83 @@ def create_pipeline_run(run_type: str, status: str = "running") -> int:
                 RETURNING run_id
             """, (run_type, status, datetime.utcnow()))
             run_id = cur.fetchone()[0]
-            conn.commit()
-            return run_id
-    finally:
-        conn.close()
+        conn.commit()
+        return run_id
 
 @retry_db_operation(max_retries=3, backoff=1.0)
-def update_pipeline_run(run_id: int, status: str, error_message: Optional[str] = None, metadata: Optional[Dict] = None):
+def update_pipeline_run(run_id: int, status: str, error_message: Optional[str] = None, metadata: Optional[Dict] = None,
+                        conn=None, commit: bool = True):
     """Update pipeline run status"""
-    conn = None
+    owns_conn = conn is None
     try:
-        conn = get_db_connection()
+        if owns_conn:
+            conn = get_db_connection()
         with conn.cursor() as cur:
-            if status == "completed":
-                cur.execute("""
-                    UPDATE pipeline_runs
-                    SET status = %s, completed_at = %s, metadata = %s
-                    WHERE run_id = %s
-                """, (status, datetime.utcnow(), Json(metadata) if metadata else None, run_id))
-            else:
-                cur.execute("""
-                    UPDATE pipeline_runs
-                    SET status = %s, error_message = %s, metadata = %s
-                    WHERE run_id = %s
-                """, (status, error_message, Json(metadata) if metadata else None, run_id))
-            conn.commit()
-    finally:
-        if conn:
-            put_db_connection(conn)
-
-@retry_db_operation(max_retries=3, backoff=1.0)
-def upsert_reddit_post(post_data: Dict[str, Any], run_id: int) -> bool:
-    """Upsert Reddit post (insert or update if exists)"""
-    conn = None
-    try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            # 데이터 검증 및 정규화
-            post_id = str(post_data.get('id', '')).strip()
-            if not post_id:
-                raise ValueError("post_data['id'] is required and cannot be empty")
-            
-            created_utc = post_data.get('created_utc', 0)
-            if not isinstance(created_utc, int) or created_utc <= 0:
-                import time
-                created_utc = int(time.time())
-                logger.warning(f"Invalid created_utc for post {post_id}, using current time")
-            
+            # 단일 statement: completed면 completed_at 기록, 그 외에는 error_message 기록
             cur.execute("""
-                INSERT INTO raw_reddit_posts (
-                    reddit_post_id, subreddit, title, body, author,
-                    created_utc, upvotes, num_comments, permalink, url,
-                    keyword, raw_json
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (reddit_post_id) DO UPDATE SET
-                    upvotes = EXCLUDED.upvotes,
-                    num_comments = EXCLUDED.num_comments,
-                    updated_at = CURRENT_TIMESTAMP
-            """, (
-                post_id,
-                (post_data.get('subreddit', '') or 'unknown')[:100],
-                (post_data.get('title', '') or 'Untitled')[:10000],
-                (post_data.get('selftext', '') or '')[:50000] or None,
-                (post_data.get('author', '') or '')[:100] or None,
-                created_utc,
-                max(0, int(post_data.get('ups', 0))),
-                max(0, int(post_data.get('num_comments', 0))),
-                (post_data.get('permalink', '') or '')[:5000] or None,
-                (post_data.get('url', '') or '')[:5000] or None,
-                (post_data.get('keyword', '') or '')[:200],
-                Json(post_data)
-            ))
-            conn.commit()
-            return True
-    except Exception as e:
-        if conn:
-            conn.rollback()
-        logger.error(f"Error upserting post {post_data.get('id', 'unknown')}: {e}")
-        raise e
+                UPDATE pipeline_runs
+                SET status = %(status)s,
+                    completed_at = CASE WHEN %(status)s = 'completed' THEN %(now)s ELSE completed_at END,
+                    error_message = CASE WHEN %(status)s = 'completed' THEN error_message ELSE %(error_message)s END,
+                    metadata = %(metadata)s
+                WHERE run_id = %(run_id)s
+            """, {
+                "status": status,
+                "now": datetime.utcnow(),
+                "error_message": error_message,
+                "metadata": Json(metadata, dumps=_dumps_json) if metadata else None,
+                "run_id": run_id,
+            })
+            if owns_conn or commit:
+                conn.commit()
     finally:
-        if conn:
+        if conn and owns_conn:
             put_db_connection(conn)
 
+_REDDIT_POST_COLUMNS = [
+    "reddit_post_id", "subreddit", "title", "body", "author",
+    "created_utc", "upvotes", "num_comments", "permalink", "url",
+    "keyword", "raw_json",
+]
+
+def bulk_upsert_reddit_posts(conn, rows: List[tuple]) -> List[tuple]:
+    """
+    포스트 행 튜플을 COPY 스테이징 후 단일 INSERT ... ON CONFLICT로 병합 (커밋은 호출자가 수행)
+    
+    Args:
+        conn: 호출자가 관리하는 연결
+        rows: _reddit_post_row 튜플 (_REDDIT_POST_COLUMNS 순서), reddit_post_id 기준으로 중복 제거된 상태여야 함
+    
+    Returns:
+        행별 (inserted,) 튜플 리스트 (xmax = 0 이면 신규 INSERT, 아니면 ON CONFLICT UPDATE)
+    """
+    if not rows:
+        return []
+    with conn.cursor() as cur:
+        stage = _copy_to_stage(cur, "raw_reddit_posts", _REDDIT_POST_COLUMNS, rows)
+        column_list = ", ".join(_REDDIT_POST_COLUMNS)
+        cur.execute(f"""
+            INSERT INTO raw_reddit_posts ({column_list})
+            SELECT {column_list} FROM {stage}
+            ON CONFLICT (reddit_post_id) DO UPDATE SET
+                upvotes = EXCLUDED.upvotes,
+                num_comments = EXCLUDED.num_comments,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING (xmax = 0) AS inserted
+        """)
+        inserted = cur.fetchall()
+        # 같은 트랜잭션에서 다음 배치가 스테이징을 재사용하므로 비워둠 (_copy_upsert와 동일)
+        cur.execute(f"TRUNCATE {stage}")
+        return inserted
+
+@retry_db_operation(max_retries=3, backoff=2.0)
+def _execute_posts_batch(insert_data: List[tuple]) -> List[tuple]:
+    """포스트 배치 적재 실행 (시도마다 연결 획득/반환, RETURNING 결과 반환)"""
+    with pooled_conn() as conn:
+        results = bulk_upsert_reddit_posts(conn, insert_data)
+        conn.commit()
+        return results
+
 def upsert_reddit_posts_batch(posts_data: List[Dict[str, Any]], run_id: int) -> Dict[str, int]:
     """Batch upsert Reddit posts (성능 개선)"""
     if not posts_data:
@@ -283,164 +466,364 @@ def upsert_reddit_posts_batch(posts_data: List[Dict[str, Any]], run_id: int) ->
             stats["errors"] += batch_stats["errors"]
         return stats
     
-    conn = None
     stats = {"inserted": 0, "updated": 0, "errors": 0}
     
-    @retry_db_operation(max_retries=3, backoff=2.0)
-    def _execute_batch_insert(insert_data):
-        nonlocal conn, stats
-        
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
+    # 배치 처리용 데이터 준비
+    # post_id 기준 중복 제거 (마지막 값 유지) - ON CONFLICT는 같은 행을 한 statement에서 두 번 갱신할 수 없음
+    rows_by_id = {}
+    now_utc = int(time.time())
+    for post_data in posts_data:
         try:
-            # 배치 INSERT
-            execute_batch(cur, """
-                INSERT INTO raw_reddit_posts (
-                    reddit_post_id, subreddit, title, body, author,
-                    created_utc, upvotes, num_comments, permalink, url,
-                    keyword, raw_json
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (reddit_post_id) DO UPDATE SET
-                    upvotes = EXCLUDED.upvotes,
-                    num_comments = EXCLUDED.num_comments,
-                    updated_at = CURRENT_TIMESTAMP
-            """, insert_data, page_size=100)
+            post_id = str(post_data.get('id', '')).strip()
+            if not post_id:
+                stats["errors"] += 1
+                continue
             
-            stats["inserted"] = len(insert_data)
-            conn.commit()
-            logger.info(f"Batch upserted {stats['inserted']} posts, {stats['errors']} errors")
+            created_utc = post_data.get('created_utc', 0)
+            if not isinstance(created_utc, int) or created_utc <= 0:
+                created_utc = now_utc
             
+            rows_by_id[post_id] = _reddit_post_row(
+                post_data, post_id, created_utc, _dumps_json(_prune_post_json(post_data))
+            )
         except Exception as e:
-            if conn:
-                conn.rollback()
-            logger.error(f"Batch insert error: {e}", exc_info=True)
-            # 첫 번째 실패한 레코드 샘플 로깅
-            if insert_data:
-                sample = insert_data[0]
-                logger.error(f"Sample data (first record): post_id={sample[0]}, "
-                           f"title_len={len(sample[2]) if sample[2] else 0}, "
-                           f"body_len={len(sample[3]) if sample[3] else 0}")
-            raise
+            logger.error(f"Error preparing post data {post_data.get('id', 'unknown')}: {e}")
+            stats["errors"] += 1
+    
+    insert_data = list(rows_by_id.values())
+    if not insert_data:
+        return stats
     
+    # 배치 INSERT 실행 (재시도 포함)
     try:
-        # 배치 처리용 데이터 준비
-        insert_data = []
-        import time as time_module
-        
-        for post_data in posts_data:
-            try:
-                post_id = str(post_data.get('id', '')).strip()
-                if not post_id:
-                    stats["errors"] += 1
-                    continue
-                
-                created_utc = post_data.get('created_utc', 0)
-                if not isinstance(created_utc, int) or created_utc <= 0:
-                    created_utc = int(time_module.time())
-                
-                insert_data.append((
-                    post_id,
-                    (post_data.get('subreddit', '') or 'unknown')[:100],
-                    (post_data.get('title', '') or 'Untitled')[:10000],
-                    (post_data.get('selftext', '') or '')[:50000] or None,
-                    (post_data.get('author', '') or '')[:100] or None,
-                    created_utc,
-                    max(0, int(post_data.get('ups', 0))),
-                    max(0, int(post_data.get('num_comments', 0))),
-                    (post_data.get('permalink', '') or '')[:5000] or None,
-                    (post_data.get('url', '') or '')[:5000] or None,
-                    (post_data.get('keyword', '') or '')[:200],
-                    Json(post_data)
-                ))
-            except Exception as e:
-                logger.error(f"Error preparing post data {post_data.get('id', 'unknown')}: {e}")
-                stats["errors"] += 1
-                continue
-        
-        if not insert_data:
-            return stats
-        
-        # 배치 INSERT 실행 (재시도 포함)
-        _execute_batch_insert(insert_data)
-        
+        results = _execute_posts_batch(insert_data)
     except Exception as e:
-        logger.error(f"Batch upsert error (final): {e}", exc_info=True)
-        stats["errors"] = len(posts_data) - stats["inserted"]
-        # 부분 성공 허용 (에러를 다시 raise하지 않음)
-        # raise  # 주석 처리: 부분 성공 허용
-    finally:
-        if conn:
-            put_db_connection(conn)
+        # 부분 성공 허용: 재시도 후에도 실패한 배치는 errors로 집계하고 raise하지 않음
+        sample = insert_data[0]
+        logger.error(f"Batch upsert error: {e} (first record: post_id={sample[0]}, "
+                     f"title_len={len(sample[2]) if sample[2] else 0}, "
+                     f"body_len={len(sample[3]) if sample[3] else 0})", exc_info=True)
+        stats["errors"] += len(insert_data)
+        return stats
     
+    # xmax = 0 이면 신규 INSERT, 아니면 ON CONFLICT UPDATE
+    inserted = sum(1 for (is_insert,) in results if is_insert)
+    stats["inserted"] = inserted
+    stats["updated"] = len(results) - inserted
+    logger.info(f"Batch upserted {stats['inserted']} new / {stats['updated']} updated posts, {stats['errors']} errors")
     return stats
 
-@retry_db_operation(max_retries=3, backoff=1.0)
-def upsert_reddit_comment(comment_data: Dict[str, Any], post_id: str, run_id: int) -> bool:
-    """Upsert Reddit comment"""
+_REDDIT_COMMENT_COLUMNS = [
+    "reddit_comment_id", "reddit_post_id", "author", "body",
+    "created_utc", "upvotes", "is_top", "raw_json",
+]
+
+def bulk_upsert_reddit_comments(conn, rows: List[tuple]) -> int:
+    """
+    댓글 행 튜플을 execute_values로 병합 (커밋은 호출자가 수행)
+    
+    Args:
+        conn: 호출자가 관리하는 연결
+        rows: _REDDIT_COMMENT_COLUMNS 순서 튜플 (raw_json은 JSON 문자열),
+              reddit_comment_id 기준으로 중복 제거된 상태여야 함
+    
+    Returns:
+        기록된 행 수 (부모 포스트가 없는 댓글은 FK 오류 대신 건너뜀)
+    """
+    if not rows:
+        return 0
+    column_list = ", ".join(_REDDIT_COMMENT_COLUMNS)
+    with conn.cursor() as cur:
+        written = execute_values(cur, f"""
+            INSERT INTO raw_reddit_comments ({column_list})
+            SELECT v.* FROM (VALUES %s) AS v({column_list})
+            WHERE EXISTS (
+                SELECT 1 FROM raw_reddit_posts p WHERE p.reddit_post_id = v.reddit_post_id
+            )
+            ON CONFLICT (reddit_comment_id) DO UPDATE SET
+                upvotes = EXCLUDED.upvotes,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING 1
+        """, rows,
+            template="(%s, %s, %s, %s, %s::bigint, %s::integer, %s::boolean, %s::jsonb)",
+            page_size=500, fetch=True)
+        return len(written)
+
+def upsert_reddit_comments_batch(comments_data: List[tuple], run_id: int) -> Dict[str, int]:
+    """
+    Batch upsert Reddit comments (execute_values, 단일 트랜잭션)
+    
+    Args:
+        comments_data: (comment_data, post_id) 튜플 리스트
+        run_id: Pipeline run ID
+    
+    부모 포스트가 raw_reddit_posts에 없는 댓글은 FK 오류 대신 건너뜀 (errors로 집계)
+    """
+    stats = {"inserted": 0, "updated": 0, "errors": 0}
+    if not comments_data:
+        return stats
+    
+    # 동일 배치 내 중복 comment_id 제거 (ON CONFLICT는 같은 행을 두 번 갱신할 수 없음)
+    rows_by_id = {}
+    now_utc = int(time.time())
+    for comment_data, post_id in comments_data:
+        comment_id = str(comment_data.get('id', '')).strip()
+        post_id_str = str(post_id).strip()
+        if not comment_id or not post_id_str:
+            stats["errors"] += 1
+            continue
+        
+        created_utc = comment_data.get('created_utc', 0)
+        if not isinstance(created_utc, int) or created_utc <= 0:
+            created_utc = now_utc
+        
+        rows_by_id[comment_id] = (
+            comment_id,
+            post_id_str,
+            _truncate(comment_data, 'author', 100, empty_none=True),
+            _truncate(comment_data, 'body', 50000),
+            created_utc,
+            max(0, int(comment_data.get('ups', 0))),
+            bool(comment_data.get('is_top', False)),
+            _dumps_json(comment_data)
+        )
+    
+    if not rows_by_id:
+        return stats
+    
     conn = None
     try:
         conn = get_db_connection()
-        with conn.cursor() as cur:
-            # 데이터 검증
-            comment_id = str(comment_data.get('id', '')).strip()
-            post_id_str = str(post_id).strip()
-            
-            if not comment_id or not post_id_str:
-                raise ValueError("comment_id and post_id are required")
-            
-            created_utc = comment_data.get('created_utc', 0)
-            if not isinstance(created_utc, int) or created_utc <= 0:
-                import time
-                created_utc = int(time.time())
-            
-            cur.execute("""
-                INSERT INTO raw_reddit_comments (
-                    reddit_comment_id, reddit_post_id, author, body,
-                    created_utc, upvotes, is_top, raw_json
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (reddit_comment_id) DO UPDATE SET
-                    upvotes = EXCLUDED.upvotes,
-                    updated_at = CURRENT_TIMESTAMP
-            """, (
-                comment_id,
-                post_id_str,
-                (comment_data.get('author', '') or '')[:100] or None,
-                (comment_data.get('body', '') or '')[:50000],
-                created_utc,
-                max(0, int(comment_data.get('ups', 0))),
-                bool(comment_data.get('is_top', False)),
-                Json(comment_data)
-            ))
-            conn.commit()
-            return True
+        written = bulk_upsert_reddit_comments(conn, list(rows_by_id.values()))
+        conn.commit()
+        
+        stats["inserted"] = written
+        stats["errors"] += len(rows_by_id) - written
+        logger.info(f"Batch upserted {stats['inserted']} comments, {stats['errors']} skipped/errors")
     except Exception as e:
         if conn:
             conn.rollback()
-        logger.error(f"Error upserting comment {comment_data.get('id', 'unknown')}: {e}")
-        raise e
+        logger.error(f"Batch comment upsert error: {e}", exc_info=True)
+        stats["errors"] = len(comments_data)
     finally:
         if conn:
             put_db_connection(conn)
+    
+    return stats
 
-def upsert_gsc_query(gsc_data: Dict[str, Any], run_id: int) -> bool:
+def set_async_commit(cur):
+    """
+    현재 트랜잭션만 synchronous_commit=off로 전환 (재생성 가능한 벌크 적재용)
+    
+    커밋 시 WAL fsync를 기다리지 않음. 서버 크래시 시 마지막 커밋 일부가 유실될 수 있으나
+    데이터 정합성은 깨지지 않으며, SET LOCAL이므로 풀에 반환된 연결에는 영향 없음
+    """
+    cur.execute("SET LOCAL synchronous_commit TO off")
+
+def _copy_value(value: Any) -> str:
+    """
+    COPY (FORMAT csv) 필드 값 변환
+    
+    NULL만 따옴표 없는 \\N으로 쓰고 나머지 값은 항상 따옴표로 감쌈
+    (따옴표 친 값은 NULL 문자열과 일치하지 않으므로 본문/쿼리 텍스트 '\\N'이 NULL로 바뀌지 않음)
+    """
+    if value is None:
+        return r'\N'
+    if isinstance(value, (dict, list)):
+        value = _dumps_json(value)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        value = '\\x' + bytes(value).hex()
+    return '"' + str(value).replace('"', '""') + '"'
+
+def _copy_to_stage(cur, table: str, columns: List[str], rows: List[tuple]) -> str:
+    """
+    COPY로 임시 스테이징 테이블(_{table}_stage)에 적재하고 테이블명 반환
+    
+    TEMP 테이블은 WAL을 기록하지 않고 세션별로 분리되어 병렬 워커 간 충돌이 없음.
+    """
+    stage = f"_{table}_stage"
+    column_list = ", ".join(columns)
+    
+    # 제약조건 없이 컬럼 타입만 복사 (id/created_at NOT NULL 등 회피)
+    cur.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DROP AS
+        SELECT {column_list} FROM {table} WITH NO DATA
+    """)
+    
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(",".join([_copy_value(v) for v in row]))
+        buf.write("\n")
+    buf.seek(0)
+    cur.copy_expert(
+        f"COPY {stage} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf
+    )
+    return stage
+
+def _copy_upsert(cur, table: str, columns: List[str], rows: List[tuple],
+                 conflict_columns: List[str], update_columns: List[str]) -> int:
+    """
+    COPY로 임시 스테이징 테이블에 적재 후 INSERT ... SELECT ... ON CONFLICT 한 번으로 병합
+    
+    행별 parse/bind가 없어 대량(수천 행 이상) 적재 시 execute_values보다 빠름.
+    스테이징 테이블은 트랜잭션 종료 시 삭제되며, 커밋은 호출자가 수행.
+    
+    Returns:
+        병합된 행 수
+    """
+    # 같은 배치 내 충돌 키 중복 제거 (ON CONFLICT는 같은 행을 두 번 갱신할 수 없음)
+    # 마지막 값 유지 - 행 단위 upsert를 순서대로 실행한 것과 동일한 결과
+    key_positions = [columns.index(col) for col in conflict_columns]
+    rows_by_key = {tuple(row[i] for i in key_positions): row for row in rows}
+    
+    stage = _copy_to_stage(cur, table, columns, list(rows_by_key.values()))
+    column_list = ", ".join(columns)
+    
+    update_set = ",\n            ".join(f"{col} = EXCLUDED.{col}" for col in update_columns)
+    cur.execute(f"""
+        INSERT INTO {table} ({column_list})
+        SELECT {column_list} FROM {stage}
+        ON CONFLICT ({", ".join(conflict_columns)}) DO UPDATE SET
+            {update_set},
+            updated_at = CURRENT_TIMESTAMP
+    """)
+    merged = cur.rowcount
+    cur.execute(f"TRUNCATE {stage}")
+    return merged
+
+def upsert_embeddings_batch(embeddings_data: List[Dict[str, Any]], model_name: str,
+                            dim: int, run_id: int) -> Dict[str, int]:
+    """
+    Batch upsert embeddings via COPY staging
+    
+    Args:
+        embeddings_data: {'doc_type', 'doc_id', 'text_hash', 'embedding'} 딕셔너리 리스트
+        model_name: Model name (e.g., 'text-embedding-3-large')
+        dim: Embedding dimension
+        run_id: Pipeline run ID
+    """
+    if not embeddings_data:
+        return {"upserted": 0}
+    
+    use_bytea = check_embedding_bytea_available()
+    # bytea만 저장 가능하면 JSON 텍스트 직렬화/저장 생략
+    skip_json = use_bytea and check_embedding_json_optional()
+    columns = ["doc_type", "doc_id", "text_hash", "embedding_json", "model_name", "dim", "created_from_run_id"]
+    update_columns = ["embedding_json", "text_hash"]
+    if use_bytea:
+        columns.append("embedding_bytea")
+        update_columns.append("embedding_bytea")
+    
+    rows = []
+    for item in embeddings_data:
+        row = (item['doc_type'], item['doc_id'], item['text_hash'],
+               None if skip_json else item['embedding'], model_name, dim, run_id)
+        if use_bytea:
+            row += (pack_embedding(item['embedding']),)
+        rows.append(row)
+    
+    with pooled_conn() as conn:
+        with conn.cursor() as cur:
+            set_async_commit(cur)
+            upserted = _copy_upsert(
+                cur, "embeddings", columns, rows,
+                ["doc_type", "doc_id", "created_from_run_id"], update_columns
+            )
+        conn.commit()
+        return {"upserted": upserted}
+
+def get_embeddings_by_text_hash(text_hashes: List[str], model_name: str) -> Dict[str, Any]:
+    """
+    text_hash별 기존 임베딩 조회 (같은 텍스트의 OpenAI 재호출 방지)
+    
+    Args:
+        text_hashes: 조회할 text_hash 리스트
+        model_name: 같은 모델로 생성된 임베딩만 재사용
+    
+    Returns:
+        {text_hash: embedding(list of floats)} (해시당 가장 최근 행)
+    """
+    if not text_hashes:
+        return {}
+    
+    with pooled_conn() as conn:
+        with conn.cursor() as cur:
+            if check_embedding_bytea_available():
+                select_cols = "embedding_bytea, CASE WHEN embedding_bytea IS NULL THEN embedding_json END"
+            else:
+                select_cols = "NULL, embedding_json"
+            cur.execute(f"""
+                SELECT DISTINCT ON (text_hash) text_hash, {select_cols}
+                FROM embeddings
+                WHERE text_hash = ANY(%s) AND model_name = %s
+                ORDER BY text_hash, created_at DESC
+            """, (list(text_hashes), model_name))
+            return {
+                text_hash: unpack_embedding(embedding_bytes) if embedding_bytes is not None else embedding_json
+                for text_hash, embedding_bytes, embedding_json in cur
+            }
+
+_GSC_COLUMNS = [
+    "query", "page", "country", "device", "date_month",
+    "impressions", "clicks", "ctr", "position", "raw_row_json",
+]
+_GSC_CONFLICT_COLUMNS = ["query", "page", "country", "device", "date_month"]
+_GSC_UPDATE_COLUMNS = ["impressions", "clicks", "ctr", "position", "raw_row_json"]
+
+def bulk_upsert_gsc_queries(conn, rows: List[tuple]) -> int:
+    """
+    GSC 행 튜플을 COPY 스테이징 후 단일 INSERT ... ON CONFLICT로 병합 (커밋은 호출자가 수행)
+    
+    Args:
+        conn: 호출자가 관리하는 연결
+        rows: (query, page, country, device, date_month, impressions, clicks, ctr, position, raw_row) 튜플,
+              충돌 키 (query, page, country, device, date_month) 기준으로 중복 제거된 상태여야 함.
+              raw_row(원본 CSV 행 dict)는 COPY 시 JSON 직렬화됨
+    
+    Returns:
+        upsert된 행 수
+    """
+    if not rows:
+        return 0
+    with conn.cursor() as cur:
+        return _copy_upsert(cur, "raw_gsc_queries", _GSC_COLUMNS, rows,
+                            _GSC_CONFLICT_COLUMNS, _GSC_UPDATE_COLUMNS)
+
+def gsc_row_to_tuple(gsc_data: Dict[str, Any], default_month: date) -> tuple:
+    """
+    GSC 행 dict를 _GSC_COLUMNS 순서 튜플로 변환 (단건/배치 공통, 마지막 요소는 원본 dict)
+    
+    Args:
+        gsc_data: query/page/country/device/date/impressions/clicks/ctr/position 키를 가진 dict
+        default_month: date가 비어 있을 때 사용할 date_month
+    """
+    date_str = gsc_data.get('date', '')
+    position = gsc_data.get('position')
+    return (
+        gsc_data.get('query', ''),
+        gsc_data.get('page', ''),
+        gsc_data.get('country', 'usa'),
+        gsc_data.get('device', 'desktop'),
+        date.fromisoformat(date_str).replace(day=1) if date_str else default_month,
+        int(gsc_data.get('impressions', 0)),
+        int(gsc_data.get('clicks', 0)),
+        float(gsc_data.get('ctr', 0)),
+        float(position) if position else None,
+        gsc_data,
+    )
+
+def upsert_gsc_query(gsc_data: Dict[str, Any], run_id: int, conn=None, commit: bool = True) -> bool:
     """Upsert GSC query data"""
-    conn = get_db_connection()
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            # Parse date_month from date
-            from datetime import datetime as dt
-            date_str = gsc_data.get('date', '')
-            if date_str:
-                date_obj = dt.strptime(date_str, '%Y-%m-%d')
-                date_month = date_obj.replace(day=1).date()
-            else:
-                date_month = datetime.utcnow().date().replace(day=1)
-            
+            row = gsc_row_to_tuple(gsc_data, datetime.utcnow().date().replace(day=1))
             cur.execute("""
                 INSERT INTO raw_gsc_queries (
                     query, page, country, device, date_month,
-                    impressions, clicks, ctr, position, raw_json
+                    impressions, clicks, ctr, position, raw_row_json
                 ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 ON CONFLICT (query, page, country, device, date_month) DO UPDATE SET
                     impressions = EXCLUDED.impressions,
@@ -448,28 +831,21 @@ def upsert_gsc_query(gsc_data: Dict[str, Any], run_id: int) -> bool:
                     ctr = EXCLUDED.ctr,
                     position = EXCLUDED.position,
                     updated_at = CURRENT_TIMESTAMP
-            """, (
-                gsc_data.get('query', ''),
-                gsc_data.get('page', ''),
-                gsc_data.get('country', 'usa'),
-                gsc_data.get('device', 'desktop'),
-                date_month,
-                int(gsc_data.get('impressions', 0)),
-                int(gsc_data.get('clicks', 0)),
-                float(gsc_data.get('ctr', 0)),
-                float(gsc_data.get('position', 0)) if gsc_data.get('position') else None,
-                Json(gsc_data)
-            ))
-            conn.commit()
+            """, row[:-1] + (Json(gsc_data, dumps=_dumps_json),))
+            if owns_conn or commit:
+                conn.commit()
             return True
     except Exception as e:
-        conn.rollback()
+        if owns_conn:
+            conn.rollback()
         raise e
     finally:
-        conn.close()
+        if owns_conn:
+            put_db_connection(conn)
 
 def upsert_embedding(doc_type: str, doc_id: str, embedding: List[float], 
-                     text_hash: str, model_name: str, dim: int, run_id: int) -> bool:
+                     text_hash: str, model_name: str, dim: int, run_id: int,
+                     conn=None, commit: bool = True) -> bool:
     """
     Upsert embedding with automatic pgvector/JSONB detection
     
@@ -481,12 +857,38 @@ def upsert_embedding(doc_type: str, doc_id: str, embedding: List[float],
         model_name: Model name (e.g., 'text-embedding-3-large')
         dim: Embedding dimension
         run_id: Pipeline run ID
+        conn: 호출자가 관리하는 연결 (None이면 풀에서 획득 후 커밋/반환)
+        commit: conn을 전달한 경우 커밋 여부 (False면 호출자가 일괄 커밋)
     """
-    conn = get_db_connection()
-    use_pgvector = check_pgvector_available()
+    use_bytea = check_embedding_bytea_available()
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_db_connection()
     
     try:
         with conn.cursor() as cur:
+            if use_bytea:
+                # JSONB + packed float32 (로드 시 JSON 파싱 없이 바이트 복사)
+                cur.execute("""
+                    INSERT INTO embeddings (
+                        doc_type, doc_id, text_hash, embedding_json, embedding_bytea,
+                        model_name, dim, created_from_run_id
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (doc_type, doc_id, created_from_run_id) DO UPDATE SET
+                        embedding_json = EXCLUDED.embedding_json,
+                        embedding_bytea = EXCLUDED.embedding_bytea,
+                        text_hash = EXCLUDED.text_hash,
+                        updated_at = CURRENT_TIMESTAMP
+                """, (
+                    doc_type, doc_id, text_hash,
+                    None if check_embedding_json_optional() else Json(embedding, dumps=_dumps_json),
+                    psycopg2.Binary(pack_embedding(embedding)),
+                    model_name, dim, run_id
+                ))
+                if owns_conn or commit:
+                    conn.commit()
+                return True
+            
             # Use JSONB (pgvector는 현재 사용하지 않음, DDL에서 JSONB로 정의됨)
             cur.execute("""
                 INSERT INTO embeddings (
@@ -498,45 +900,24 @@ def upsert_embedding(doc_type: str, doc_id: str, embedding: List[float],
                     text_hash = EXCLUDED.text_hash,
                     updated_at = CURRENT_TIMESTAMP
             """, (
-                doc_type, doc_id, text_hash, Json(embedding),
+                doc_type, doc_id, text_hash, Json(embedding, dumps=_dumps_json),
                 model_name, dim, run_id
             ))
-            conn.commit()
-            return True
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
-
-def upsert_cluster_assignment(cluster_id: int, doc_type: str, doc_id: str,
-                              distance: float, is_representative: bool, run_id: int) -> bool:
-    """Upsert cluster assignment"""
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO cluster_assignments (
-                    cluster_id, doc_type, doc_id, distance_to_centroid,
-                    is_representative, created_from_run_id
-                ) VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (doc_type, doc_id, created_from_run_id) DO UPDATE SET
-                    cluster_id = EXCLUDED.cluster_id,
-                    distance_to_centroid = EXCLUDED.distance_to_centroid,
-                    is_representative = EXCLUDED.is_representative,
-                    updated_at = CURRENT_TIMESTAMP
-            """, (cluster_id, doc_type, doc_id, distance, is_representative, run_id))
-            conn.commit()
+            if owns_conn or commit:
+                conn.commit()
             return True
     except Exception as e:
-        conn.rollback()
+        if owns_conn:
+            conn.rollback()
         raise e
     finally:
-        conn.close()
+        if owns_conn:
+            put_db_connection(conn)
 
 def upsert_topic_qa_brief(brief_data: Dict[str, Any], cluster_id: int, 
                           model_name: str, model_version: str, run_id: int,
-                          insights_json: Optional[Dict[str, Any]] = None) -> bool:
+                          insights_json: Optional[Dict[str, Any]] = None,
+                          conn=None, commit: bool = True) -> bool:
     """
     Upsert topic Q&A brief with insights_json
     
@@ -547,8 +928,12 @@ def upsert_topic_qa_brief(brief_data: Dict[str, Any], cluster_id: int,
         model_version: Model version
         run_id: Pipeline run ID
         insights_json: Insights module JSON (optional)
+        conn: 호출자가 관리하는 연결 (None이면 풀에서 획득 후 커밋/반환)
+        commit: conn을 전달한 경우 커밋 여부 (False면 호출자가 일괄 커밋)
     """
-    conn = get_db_connection()
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_db_connection()
     try:
         with conn.cursor() as cur:
             cur.execute("""
@@ -574,20 +959,23 @@ def upsert_topic_qa_brief(brief_data: Dict[str, Any], cluster_id: int,
                 brief_data.get('category'),
                 brief_data.get('topic_title'),
                 brief_data.get('primary_question'),
-                Json(brief_data.get('related_questions', [])),
+                Json(brief_data.get('related_questions', []), dumps=_dumps_json),
                 brief_data.get('blog_angle'),
                 brief_data.get('social_angle'),
-                Json(brief_data.get('why_now', {})),
-                Json(brief_data.get('evidence_pack', {})),
-                Json(insights_json) if insights_json else None,
+                Json(brief_data.get('why_now', {}), dumps=_dumps_json),
+                Json(brief_data.get('evidence_pack', {}), dumps=_dumps_json),
+                Json(insights_json, dumps=_dumps_json) if insights_json else None,
                 model_name,
                 model_version,
                 run_id
             ))
-            conn.commit()
+            if owns_conn or commit:
+                conn.commit()
             return True
     except Exception as e:
-        conn.rollback()
+        if owns_conn:
+            conn.rollback()
         raise e
     finally:
-        conn.close()
+        if owns_conn:
+            put_db_connection(conn)
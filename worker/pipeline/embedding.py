@@ -3,10 +3,16 @@ Embedding generation using OpenAI
 """
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any
 from openai import OpenAI
-from .config import EMBEDDING_MODEL, EMBEDDING_DIM, API_MAX_RETRIES, API_BACKOFF_FACTOR
-from .db import get_db_connection, upsert_embedding
+from .config import (
+    EMBEDDING_MODEL, EMBEDDING_DIM, EMBEDDING_BATCH_SIZE, EMBED_CONCURRENCY,
+    API_MAX_RETRIES, API_BACKOFF_FACTOR
+)
+from .db import (
+    get_db_connection, put_db_connection, upsert_embeddings_batch, get_embeddings_by_text_hash
+)
 from .preprocess import clean_text, get_text_hash as hash_text
 from .logging import setup_logger
 
@@ -29,6 +35,24 @@ def generate_embedding(text: str, client: OpenAI) -> List[float]:
             else:
                 raise
 
+def generate_embeddings_batch(texts: List[str], client: OpenAI) -> List[List[float]]:
+    """Generate embeddings for several texts in one API call (same retry policy as generate_embedding)"""
+    for attempt in range(API_MAX_RETRIES):
+        try:
+            response = client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=texts
+            )
+            # Results carry their input index; sort to be safe
+            return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+        except Exception as e:
+            if attempt < API_MAX_RETRIES - 1:
+                wait_time = API_BACKOFF_FACTOR ** attempt
+                logger.warning(f"Batch embedding generation failed, retrying in {wait_time}s: {e}")
+                time.sleep(wait_time)
+            else:
+                raise
+
 def generate_embeddings(run_id: int, dry_run: bool = False) -> Dict[str, Any]:
     """Generate embeddings for Reddit posts"""
     openai_key = os.getenv("OPENAI_API_KEY")
@@ -37,15 +61,21 @@ def generate_embeddings(run_id: int, dry_run: bool = False) -> Dict[str, Any]:
     
     client = OpenAI(api_key=openai_key)
     
-    conn = get_db_connection()
     stats = {
         "posts_processed": 0,
         "embeddings_created": 0,
+        "embeddings_reused": 0,
         "errors": []
     }
     
+    # Stream targets, then release the connection before the (slow) API calls.
+    # Rows are cleaned and hashed as they arrive so identical texts (crossposts, reposts) are embedded once
+    docs = []
+    conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
+        # Server-side cursor: rows arrive in itersize chunks instead of one fetchall list
+        with conn.cursor(name="posts_to_embed") as cur:
+            cur.itersize = 500
             # Get posts that don't have embeddings for this run
             cur.execute("""
                 SELECT rp.reddit_post_id, rp.title, rp.body
@@ -60,48 +90,97 @@ def generate_embeddings(run_id: int, dry_run: bool = False) -> Dict[str, Any]:
                 LIMIT 1000
             """, (run_id,))
             
-            posts = cur.fetchall()
-            stats["posts_processed"] = len(posts)
-            
-            logger.info(f"Generating embeddings for {stats['posts_processed']} posts")
-            
-            for post_id, title, body in posts:
+            for post_id, title, body in cur:
+                stats["posts_processed"] += 1
+                if dry_run:
+                    if stats["posts_processed"] <= 3:
+                        logger.info(f"[DRY RUN] Would generate embedding for post: {(title or '')[:50]}...")
+                    continue
+                text = f"{clean_text(title or '')} {clean_text(body or '')}"
+                docs.append((post_id, hash_text(text), text))
+    finally:
+        put_db_connection(conn)
+    
+    logger.info(f"Generating embeddings for {stats['posts_processed']} posts")
+    
+    if dry_run:
+        stats["embeddings_created"] = stats["posts_processed"]
+        return stats
+    
+    # Reuse vectors already stored for the same text and model
+    try:
+        known = get_embeddings_by_text_hash(list({h for _, h, _ in docs}), EMBEDDING_MODEL)
+    except Exception as e:
+        logger.warning(f"Embedding reuse lookup failed, embedding all posts: {e}")
+        known = {}
+    
+    posts_by_hash: Dict[str, List[str]] = {}
+    pending_texts: Dict[str, str] = {}
+    for post_id, text_hash, text in docs:
+        posts_by_hash.setdefault(text_hash, []).append(post_id)
+        if text_hash not in known:
+            pending_texts.setdefault(text_hash, text)
+    
+    def _store(results: List[tuple]):
+        """Fan each (text_hash, embedding) out to its posts and store them with one COPY-staged upsert"""
+        batch = []
+        for text_hash, embedding in results:
+            if isinstance(embedding, Exception):
+                for post_id in posts_by_hash[text_hash]:
+                    logger.error(f"Error generating embedding for post {post_id}: {embedding}")
+                    stats["errors"].append(str(embedding))
+                continue
+            for post_id in posts_by_hash[text_hash]:
+                batch.append({
+                    "doc_type": "reddit_post",
+                    "doc_id": post_id,
+                    "text_hash": text_hash,
+                    "embedding": embedding,
+                })
+        try:
+            upserted = upsert_embeddings_batch(batch, EMBEDDING_MODEL, EMBEDDING_DIM, run_id)
+            stats["embeddings_created"] += upserted["upserted"]
+        except Exception as e:
+            logger.error(f"Error storing embeddings for chunk of {len(batch)} posts: {e}")
+            stats["errors"].append(str(e))
+    
+    reused = [(text_hash, known[text_hash]) for text_hash in posts_by_hash if text_hash in known]
+    stats["embeddings_reused"] += sum(len(posts_by_hash[h]) for h, _ in reused)
+    logger.info(f"Reusing stored embeddings for {stats['embeddings_reused']} posts, "
+                f"embedding {len(pending_texts)} unique texts")
+    for i in range(0, len(reused), EMBEDDING_BATCH_SIZE):
+        _store(reused[i:i + EMBEDDING_BATCH_SIZE])
+    
+    def _embed_chunk(chunk: List[tuple]) -> List[tuple]:
+        """Embed a chunk of (text_hash, text) pairs with one API call (runs on a worker thread)"""
+        texts = [text for _, text in chunk]
+        try:
+            embeddings = generate_embeddings_batch(texts, client)
+        except Exception as e:
+            # One oversized/invalid input fails the whole request; fall back to per-post calls
+            logger.warning(f"Batch of {len(chunk)} failed, embedding individually: {e}")
+            embeddings = []
+            for text in texts:
                 try:
-                    # Combine title and body
-                    combined_text = f"{clean_text(title or '')} {clean_text(body or '')}"
-                    text_hash = hash_text(combined_text)
-                    
-                    if dry_run:
-                        if stats["embeddings_created"] < 3:
-                            logger.info(f"[DRY RUN] Would generate embedding for post: {title[:50]}...")
-                        stats["embeddings_created"] += 1
-                        continue
-                    
-                    # Generate embedding
-                    embedding = generate_embedding(combined_text, client)
-                    
-                    # Store embedding
-                    upsert_embedding(
-                        doc_type="reddit_post",
-                        doc_id=post_id,
-                        embedding=embedding,
-                        text_hash=text_hash,
-                        model_name=EMBEDDING_MODEL,
-                        dim=EMBEDDING_DIM,
-                        run_id=run_id
-                    )
-                    
-                    stats["embeddings_created"] += 1
-                    
-                    # Rate limiting
-                    time.sleep(0.1)
-                
-                except Exception as e:
-                    logger.error(f"Error generating embedding for post {post_id}: {e}")
-                    stats["errors"].append(str(e))
+                    embeddings.append(generate_embedding(text, client))
+                except Exception as item_error:
+                    embeddings.append(item_error)
+        return [(text_hash, embedding) for (text_hash, _), embedding in zip(chunk, embeddings)]
     
-    finally:
-        conn.close()
+    pending = list(pending_texts.items())
+    chunks = [pending[i:i + EMBEDDING_BATCH_SIZE] for i in range(0, len(pending), EMBEDDING_BATCH_SIZE)]
+    
+    # API calls run concurrently per chunk; DB writes stay on this thread
+    with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY) as executor:
+        futures = {executor.submit(_embed_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.error(f"Error generating embeddings for chunk of {len(futures[future])} texts: {e}")
+                stats["errors"].append(str(e))
+                continue
+            _store(results)
     
     logger.info(f"Embedding generation completed: {stats['embeddings_created']} embeddings created")
     return stats
@@ -2,15 +2,139 @@
 Google Search Console CSV ingestion
 """
 import csv
+import io
+import multiprocessing
 import os
-from typing import Dict, Any, List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, List, Tuple
 from pathlib import Path
-from datetime import datetime
-from .db import upsert_gsc_query
+from datetime import date, datetime
+from .db import get_db_connection, put_db_connection, bulk_upsert_gsc_queries, set_async_commit
 from .logging import setup_logger
 
 logger = setup_logger("ingest_gsc")
 
+# COPY 한 번에 스테이징할 행 수 (버퍼 메모리 상한)
+GSC_FLUSH_SIZE = 10000
+
+# CSV 헤더에서 위치를 찾을 컬럼 (page/country/device/ctr/position은 선택)
+GSC_CSV_FIELDS = ('query', 'page', 'country', 'device', 'date', 'impressions', 'clicks', 'ctr', 'position')
+
+# 필수 컬럼 (헤더에 없으면 전체 행 건너뜀)
+GSC_REQUIRED_FIELDS = ('query', 'date', 'impressions', 'clicks')
+
+# 파싱 청크 크기 (줄 경계로 맞춤) / 파싱 프로세스 수 (None: os.cpu_count())
+GSC_PARSE_CHUNK_BYTES = 16 * 1024 * 1024
+GSC_PARSE_WORKERS = None
+
+def _read_header(csv_path: str) -> Tuple[List[str], int]:
+    """CSV 헤더와 데이터 시작 바이트 오프셋 반환"""
+    with open(csv_path, 'rb') as f:
+        line = f.readline()
+        return next(csv.reader([line.decode('utf-8')]), []), f.tell()
+
+def _chunk_bounds(csv_path: str, data_start: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """데이터 영역을 약 chunk_bytes 크기의 (start, end) 구간으로 분할 (항상 줄 경계에서 자름)"""
+    size = os.path.getsize(csv_path)
+    bounds = []
+    with open(csv_path, 'rb') as f:
+        start = data_start
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = f.tell()
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+def _parse_chunk(csv_path: str, start: int, end: int, header: List[str],
+                 target_year: int) -> Tuple[List[tuple], int, List[str]]:
+    """
+    CSV 구간 하나를 파싱/검증해 COPY용 행 튜플 반환 (프로세스 풀 작업 단위)
+    
+    Returns:
+        (충돌 키 기준 중복 제거된 행 튜플 리스트, 처리한 행 수, 오류 메시지 리스트)
+    """
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start).decode('utf-8')
+    
+    col = {name: header.index(name) if name in header else None for name in GSC_CSV_FIELDS}
+    i_query, i_page, i_country, i_device = col['query'], col['page'], col['country'], col['device']
+    i_date, i_impressions, i_clicks = col['date'], col['impressions'], col['clicks']
+    i_ctr, i_position = col['ctr'], col['position']
+    
+    # 충돌 키 기준 버퍼 (같은 월의 일별 행은 마지막 값 유지 - 기존 행 단위 upsert와 동일)
+    rows = {}
+    processed = 0
+    errors = []
+    
+    # DictReader 대신 csv.reader + 헤더 위치 인덱스 (행마다 dict 생성/해시 조회 제거)
+    for row in csv.reader(io.StringIO(data)):
+        # 빈 줄은 DictReader와 동일하게 건너뜀 (처리 건수에도 포함하지 않음)
+        if not row:
+            continue
+        processed += 1
+        try:
+            # Validate date range (last year: Jan 1 - Dec 31)
+            date_str = row[i_date]
+            try:
+                # date.fromisoformat: strptime 대비 포맷 해석 비용 없음 (C 구현)
+                date_obj = date.fromisoformat(date_str)
+                if date_obj.year != target_year:
+                    logger.debug(f"Row date {date_str} not in last year, skipping")
+                    continue
+            except ValueError:
+                logger.warning(f"Invalid date format: {date_str}, skipping")
+                continue
+            
+            # date_month는 검증 시 파싱한 날짜로 한 번만 계산
+            key = (
+                row[i_query],
+                row[i_page] if i_page is not None else '',
+                row[i_country] if i_country is not None else 'usa',
+                row[i_device] if i_device is not None else 'desktop',
+                date_obj.replace(day=1),
+            )
+            position = row[i_position] if i_position is not None else ''
+            rows[key] = key + (
+                int(row[i_impressions]),
+                int(row[i_clicks]),
+                float(row[i_ctr]) if i_ctr is not None else 0.0,
+                float(position) if position else None,
+                # raw_row_json용 원본 행 (검증 통과 행에만 dict 생성)
+                dict(zip(header, row)),
+            )
+        
+        except Exception as e:
+            logger.error(f"Error processing row {processed} of chunk at byte {start}: {e}")
+            errors.append(str(e))
+    
+    return list(rows.values()), processed, errors
+
+def _iter_parsed_chunks(csv_path: str, header: List[str], bounds: List[Tuple[int, int]],
+                        target_year: int) -> Iterator[Tuple[List[tuple], int, List[str]]]:
+    """청크 파싱 결과를 파일 순서대로 반환 (청크가 여러 개면 프로세스 풀에서 병렬 파싱)"""
+    workers = min(GSC_PARSE_WORKERS or os.cpu_count() or 1, len(bounds))
+    if workers <= 1:
+        for start, end in bounds:
+            yield _parse_chunk(csv_path, start, end, header, target_year)
+        return
+    
+    # all 모드에서는 Reddit 수집 스레드와 동시에 실행되므로 fork 대신 spawn 사용
+    # (스레드가 잡고 있던 락/연결 상태가 자식에 복제되어 교착되는 것을 방지)
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        # 순서 유지 + 메모리 상한: 동시에 대기하는 청크 결과는 workers * 2개까지
+        pending = deque()
+        for start, end in bounds:
+            pending.append(executor.submit(_parse_chunk, csv_path, start, end, header, target_year))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
 def ingest_gsc_csv(csv_path: str, run_id: int, dry_run: bool = False) -> Dict[str, Any]:
     """Ingest GSC CSV file"""
     if not os.path.exists(csv_path):
@@ -24,46 +148,61 @@ def ingest_gsc_csv(csv_path: str, run_id: int, dry_run: bool = False) -> Dict[st
     
     logger.info(f"Starting GSC CSV ingestion from: {csv_path}")
     
-    try:
+    if dry_run:
         with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            
+            reader = csv.reader(f)
+            header = next(reader, [])
             for row in reader:
-                try:
-                    stats["rows_processed"] += 1
-                    
-                    if dry_run:
-                        if stats["rows_processed"] <= 5:
-                            logger.info(f"[DRY RUN] Sample row: {row}")
-                        continue
-                    
-                    # Validate required fields
-                    required_fields = ['query', 'date', 'impressions', 'clicks']
-                    if not all(field in row for field in required_fields):
-                        logger.warning(f"Row {stats['rows_processed']} missing required fields, skipping")
-                        continue
-                    
-                    # Validate date range (last year: Jan 1 - Dec 31)
-                    try:
-                        date_obj = datetime.strptime(row['date'], '%Y-%m-%d')
-                        current_year = datetime.now().year
-                        if date_obj.year != current_year - 1:
-                            logger.debug(f"Row date {row['date']} not in last year, skipping")
-                            continue
-                    except ValueError:
-                        logger.warning(f"Invalid date format: {row['date']}, skipping")
-                        continue
-                    
-                    upsert_gsc_query(row, run_id)
-                    stats["rows_inserted"] += 1
-                
-                except Exception as e:
-                    logger.error(f"Error processing row {stats['rows_processed']}: {e}")
-                    stats["errors"].append(str(e))
+                if not row:
+                    continue
+                stats["rows_processed"] += 1
+                if stats["rows_processed"] <= 5:
+                    logger.info(f"[DRY RUN] Sample row: {dict(zip(header, row))}")
+        logger.info(f"GSC CSV ingestion completed: {stats['rows_inserted']} rows inserted")
+        return stats
+    
+    target_year = datetime.now().year - 1
+    header, data_start = _read_header(csv_path)
+    bounds = _chunk_bounds(csv_path, data_start, GSC_PARSE_CHUNK_BYTES)
+    
+    # Validate required fields
+    if not all(field in header for field in GSC_REQUIRED_FIELDS):
+        logger.warning(f"GSC CSV header missing required fields {GSC_REQUIRED_FIELDS}, skipping all rows")
+        bounds = []
+    
+    # 청크 간 중복 키는 파일 순서대로 upsert되므로 마지막 값 유지
+    buffer = {}
+    conn = get_db_connection()
+    
+    def flush():
+        if buffer:
+            stats["rows_inserted"] += bulk_upsert_gsc_queries(conn, list(buffer.values()))
+            buffer.clear()
+    
+    try:
+        # CSV에서 재적재 가능한 데이터이므로 커밋 fsync 대기 생략
+        with conn.cursor() as cur:
+            set_async_commit(cur)
+        
+        # 파싱/검증은 프로세스 풀, COPY는 이 프로세스의 단일 연결에서 실행
+        for rows, processed, errors in _iter_parsed_chunks(csv_path, header, bounds, target_year):
+            stats["rows_processed"] += processed
+            stats["errors"].extend(errors)
+            for row in rows:
+                buffer[row[:5]] = row
+                if len(buffer) >= GSC_FLUSH_SIZE:
+                    flush()
+        
+        flush()
+        # 전체 CSV를 단일 트랜잭션으로 커밋
+        conn.commit()
     
     except Exception as e:
+        conn.rollback()
         logger.error(f"Error reading CSV file: {e}")
         raise
+    finally:
+        put_db_connection(conn)
     
     logger.info(f"GSC CSV ingestion completed: {stats['rows_inserted']} rows inserted")
     return stats
@@ -2,52 +2,129 @@
 Keyword extraction using TF-IDF
 """
 from typing import List, Dict, Any
-from sklearn.feature_extraction.text import TfidfVectorizer
-from .config import TOP_KEYWORDS_COUNT
-from .db import get_db_connection
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.utils import murmurhash3_32
+from .config import TOP_KEYWORDS_COUNT, TFIDF_HASH_FEATURES
+from .db import get_db_connection, put_db_connection
 from .logging import setup_logger
 
 logger = setup_logger("keywords")
 
-def extract_keywords_for_cluster(cluster_id: int, run_id: int) -> List[str]:
-    """Extract top keywords for a cluster using TF-IDF"""
-    conn = get_db_connection()
+# run_id -> {cluster_id: top keywords}; a run's cluster assignments never change once written
+_run_keywords_cache: Dict[int, Dict[int, List[str]]] = {}
+_RUN_KEYWORDS_CACHE_SIZE = 4
+
+def extract_keywords_for_cluster(cluster_id: int, run_id: int, conn=None) -> List[str]:
+    """Extract top keywords for a cluster using TF-IDF (reuses conn when given, cached per run)"""
+    return extract_keywords_for_clusters([cluster_id], run_id, conn=conn)[cluster_id]
+
+def extract_keywords_for_clusters(cluster_ids: List[int], run_id: int, conn=None) -> Dict[int, List[str]]:
+    """
+    Keywords for several clusters from the run-wide TF-IDF fit
+    
+    Same terms the keyword stage reports (extract_keywords_by_cluster), so briefs and
+    keyword stats never disagree; the fit runs at most once per run.
+    """
+    keywords_by_cluster = extract_keywords_by_cluster(run_id, conn=conn)
+    return {cluster_id: list(keywords_by_cluster.get(cluster_id, [])) for cluster_id in cluster_ids}
+
+def _hash_index(token: str, n_features: int) -> int:
+    """Column index HashingVectorizer assigns to a token (signed MurmurHash3, seed 0)"""
+    h = murmurhash3_32(token, seed=0, positive=False)
+    if h == -2147483648:
+        return (2147483647 - (n_features - 1)) % n_features
+    return abs(h) % n_features
+
+def _cache_run_keywords(run_id: int, keywords_by_cluster: Dict[int, List[str]]) -> Dict[int, List[str]]:
+    """Store one run's keywords, evicting the oldest run past the size limit"""
+    _run_keywords_cache[run_id] = keywords_by_cluster
+    if len(_run_keywords_cache) > _RUN_KEYWORDS_CACHE_SIZE:
+        _run_keywords_cache.pop(next(iter(_run_keywords_cache)), None)
+    return keywords_by_cluster
+
+def extract_keywords_by_cluster(run_id: int, conn=None) -> Dict[int, List[str]]:
+    """
+    Extract top keywords for every cluster of a run with a single TF-IDF fit
+    
+    Posts are hashed into a fixed feature space (no vocabulary dict) and TF-IDF weighted once;
+    per-cluster term scores are the row sums of the shared matrix, computed as one sparse
+    (clusters x docs) @ (docs x features) product. Only the winning hash columns are mapped
+    back to terms. Results are cached per run (labeling reuses the keyword stage's fit).
+    """
+    cached = _run_keywords_cache.get(run_id)
+    if cached is not None:
+        return cached
+    
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_db_connection()
     
     try:
         with conn.cursor() as cur:
-            # Get all posts in cluster
             cur.execute("""
-                SELECT rp.title, rp.body
-                FROM raw_reddit_posts rp
-                JOIN cluster_assignments ca ON ca.doc_id = rp.reddit_post_id
-                WHERE ca.cluster_id = %s
-                AND ca.created_from_run_id = %s
-            """, (cluster_id, run_id))
-            
-            posts = cur.fetchall()
-            
-            if not posts:
-                return []
-            
-            # Combine titles and bodies
-            documents = [f"{title} {body}" for title, body in posts]
-            
-            # TF-IDF
-            vectorizer = TfidfVectorizer(max_features=TOP_KEYWORDS_COUNT * 2, stop_words='english')
-            tfidf_matrix = vectorizer.fit_transform(documents)
-            
-            # Get feature names and scores
-            feature_names = vectorizer.get_feature_names_out()
-            scores = tfidf_matrix.sum(axis=0).A1
-            
-            # Sort by score
-            top_indices = scores.argsort()[-TOP_KEYWORDS_COUNT:][::-1]
-            keywords = [feature_names[i] for i in top_indices]
-            
-            return keywords.tolist()
-    
+                SELECT ca.cluster_id, rp.title, rp.body
+                FROM cluster_assignments ca
+                JOIN clusters c ON c.cluster_id = ca.cluster_id
+                JOIN raw_reddit_posts rp ON rp.reddit_post_id = ca.doc_id
+                WHERE ca.created_from_run_id = %s
+                AND c.noise_label = FALSE
+            """, (run_id,))
+            rows = cur.fetchall()
     finally:
-        conn.close()
+        if owns_conn:
+            put_db_connection(conn)
+    
+    if not rows:
+        return _cache_run_keywords(run_id, {})
+    
+    # Tokenize once; the token lists feed both the hasher and the reverse lookup
+    analyzer = HashingVectorizer(stop_words='english').build_analyzer()
+    token_lists = [analyzer(f"{title or ''} {body or ''}") for _, title, body in rows]
+    hasher = HashingVectorizer(
+        n_features=TFIDF_HASH_FEATURES, analyzer=lambda tokens: tokens,
+        alternate_sign=False, norm=None
+    )
+    tfidf_matrix = TfidfTransformer().fit_transform(hasher.transform(token_lists))
+    
+    # Dense group index per document, then group-sum via one sparse matmul
+    cluster_ids, group_index = np.unique(
+        np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+        return_inverse=True
+    )
+    n_docs = len(rows)
+    group_matrix = sparse.csr_matrix(
+        (np.ones(n_docs, dtype=tfidf_matrix.dtype), (group_index, np.arange(n_docs))),
+        shape=(len(cluster_ids), n_docs)
+    )
+    cluster_scores = (group_matrix @ tfidf_matrix).tocsr()
+    
+    top_columns_by_cluster = {}
+    for row_idx, cluster_id in enumerate(cluster_ids.tolist()):
+        # Only the nonzero columns of this cluster are candidates
+        start, end = cluster_scores.indptr[row_idx], cluster_scores.indptr[row_idx + 1]
+        scores = cluster_scores.data[start:end]
+        columns = cluster_scores.indices[start:end]
+        k = min(TOP_KEYWORDS_COUNT, scores.size)
+        if k == 0:
+            top_columns_by_cluster[cluster_id] = []
+            continue
+        top = np.argpartition(scores, -k)[-k:]
+        top_columns_by_cluster[cluster_id] = columns[top[np.argsort(scores[top])[::-1]]].tolist()
+    
+    # Reverse lookup for the winning columns only (on a hash collision any one colliding token is used)
+    needed = {col for cols in top_columns_by_cluster.values() for col in cols}
+    column_terms = {}
+    for token in set().union(*token_lists):
+        col = _hash_index(token, TFIDF_HASH_FEATURES)
+        if col in needed and col not in column_terms:
+            column_terms[col] = token
+    
+    return _cache_run_keywords(run_id, {
+        cluster_id: [column_terms[col] for col in cols if col in column_terms]
+        for cluster_id, cols in top_columns_by_cluster.items()
+    })
 
 def extract_keywords_for_all_clusters(run_id: int, dry_run: bool = False) -> Dict[str, Any]:
     """Extract keywords for all clusters"""
@@ -70,8 +147,10 @@ def extract_keywords_for_all_clusters(run_id: int, dry_run: bool = False) -> Dic
             clusters = cur.fetchall()
             logger.info(f"Extracting keywords for {len(clusters)} clusters")
             
+            keywords_by_cluster = extract_keywords_by_cluster(run_id, conn=conn)
+            
             for (cluster_id,) in clusters:
-                keywords = extract_keywords_for_cluster(cluster_id, run_id)
+                keywords = keywords_by_cluster.get(cluster_id, [])
                 
                 if dry_run:
                     if stats["clusters_processed"] < 3:
@@ -83,7 +162,7 @@ def extract_keywords_for_all_clusters(run_id: int, dry_run: bool = False) -> Dic
                 stats["clusters_processed"] += 1
     
     finally:
-        conn.close()
+        put_db_connection(conn)
     
     logger.info(f"Keyword extraction completed: {stats['keywords_extracted']} keywords extracted")
     return stats
@@ -2,21 +2,279 @@
 LLM-based cluster labeling and Q&A brief generation
 """
 import os
-import json
+import random
+import re
 import time
-from typing import Dict, Any, List
-from openai import OpenAI
-from .config import LLM_MODEL, LLM_MODEL_VERSION, LLM_MAX_RETRIES, LLM_TEMPERATURE, MAX_BRIEFS_TO_GENERATE
-from .db import get_db_connection, upsert_topic_qa_brief
-from .keywords import extract_keywords_for_cluster
-from .models import TopicQABrief
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+import tiktoken
+from openai import OpenAI, RateLimitError
+from .config import (
+    LLM_MODEL, LLM_MODEL_VERSION, LLM_MAX_RETRIES, LLM_TEMPERATURE, LLM_CONCURRENCY,
+    LLM_BRIEFS_PER_CALL, MAX_BRIEFS_TO_GENERATE
+)
+from .db import get_db_connection, put_db_connection, pooled_conn, upsert_topic_qa_brief
+from .keywords import extract_keywords_for_clusters
+from .models import TopicQABrief, BatchedBriefs
 from .logging import setup_logger
 
 logger = setup_logger("labeling")
 
-def build_llm_prompt(cluster_id: int, run_id: int) -> str:
+# Static instructions go in the system message so every request shares the same
+# prefix (OpenAI prompt caching); only the cluster data varies in the user message
+_BRIEF_SCHEMA = """{
+  "category": "One of: SPRING_RECIPES, SPRING_KITCHEN_STYLING, REFRIGERATOR_ORGANIZATION, VEGETABLE_PREP_HANDLING",
+  "topic_title": "Topic title in Korean (max 500 chars)",
+  "primary_question": "Primary question in Korean",
+  "related_questions": ["Question 1", "Question 2", ...],
+  "blog_angle": "Blog content angle in Korean",
+  "social_angle": "Social media content angle in Korean",
+  "why_now": {"reason": "...", "trend": "..."},
+  "evidence_summary": "Summary of evidence in Korean"
+}"""
+
+_SYSTEM_PROMPT = f"""You are a content strategist analyzing kitchen lifestyle topics. Always respond with valid JSON only.
+
+You receive one or more clusters of Reddit posts. Each cluster comes with representative posts,
+key keywords, monthly Reddit trends and, when available, Google Search Console queries and a
+SERP AI Overview. Write one Q&A content brief per cluster with this structure:
+{_BRIEF_SCHEMA}
+
+Category guide:
+- SPRING_RECIPES: seasonal dishes, ingredients and cooking ideas
+- SPRING_KITCHEN_STYLING: kitchen decor, layout and seasonal refresh
+- REFRIGERATOR_ORGANIZATION: fridge/freezer storage, organization and food keeping
+- VEGETABLE_PREP_HANDLING: washing, cutting, prepping and storing vegetables
+
+Ground "why_now" in the trend, search and AI Overview data provided for that cluster.
+If the message contains a single cluster, respond with one brief object.
+If it contains several numbered clusters, respond with {{"briefs": [...]}} holding exactly one brief
+per cluster, in the same order (Cluster 1 first)."""
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Prompt snippet budgets (tokens): fixed-size samples keep prompt size and cache prefixes stable
+_SAMPLE_BODY_TOKENS = 40
+_SERP_AIO_TOKENS = 80
+
+@lru_cache(maxsize=1)
+def _prompt_encoding():
+    """tiktoken encoding for LLM_MODEL (cl100k_base for models tiktoken does not know)"""
+    try:
+        return tiktoken.encoding_for_model(LLM_MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    """Collapse whitespace and cut to max_tokens tokens ("..." appended only when cut)"""
+    text = _WHITESPACE_RE.sub(' ', text or "").strip()
+    enc = _prompt_encoding()
+    ids = enc.encode(text)
+    if len(ids) <= max_tokens:
+        return text
+    # A cut inside a multi-byte character decodes to U+FFFD; drop it with trailing spaces
+    return enc.decode(ids[:max_tokens]).rstrip(" \ufffd") + "..."
+
+def _keyword_patterns(keywords_by_key: Dict[Any, List[str]]) -> Tuple[List[Any], List[int], List[str]]:
+    """
+    키워드 묶음을 unnest용 (묶음 번호, ILIKE 패턴) 평행 배열로 변환
+    
+    묶음 키(튜플 등)는 SQL로 보낼 수 없으므로 keys 리스트의 위치를 번호로 사용.
+    키워드 안의 LIKE 와일드카드는 문자 그대로 매칭.
+    
+    Returns:
+        (keys, key_indexes, patterns)
+    """
+    keys = list(keywords_by_key)
+    key_indexes, patterns = [], []
+    for key_idx, key in enumerate(keys):
+        for kw in dict.fromkeys(keywords_by_key[key]):
+            key_indexes.append(key_idx)
+            patterns.append("%" + kw.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+    return keys, key_indexes, patterns
+
+def fetch_gsc_matches(cur, keywords_by_key: Dict[Any, List[str]], limit: int = 10) -> Dict[Any, List[tuple]]:
+    """
+    여러 키워드 묶음의 GSC 연관 쿼리를 한 번의 조회로 가져오기
+    
+    (묶음, 패턴) 쌍을 unnest해 쿼리와 조인하고, 묶음별 상위 limit개 자르기까지 SQL에서 수행
+    (패턴마다 pg_trgm 인덱스 스캔, 여러 패턴에 걸리는 행은 묶음당 한 번만 집계)
+    
+    Returns:
+        {key: [(query, total_impressions, total_clicks, avg_ctr, avg_position), ...]}
+        (묶음별 total_impressions 내림차순 상위 limit개)
+    """
+    matches = {key: [] for key in keywords_by_key}
+    keys, key_indexes, patterns = _keyword_patterns(keywords_by_key)
+    if not patterns:
+        return matches
+    
+    cur.execute("""
+        SELECT key_idx, query, total_impressions, total_clicks, avg_ctr, avg_position
+        FROM (
+            SELECT m.key_idx, m.query,
+                   SUM(m.impressions) AS total_impressions,
+                   SUM(m.clicks) AS total_clicks,
+                   AVG(m.ctr) AS avg_ctr,
+                   AVG(m.position) AS avg_position,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY m.key_idx ORDER BY SUM(m.impressions) DESC, m.query
+                   ) AS rn
+            FROM (
+                SELECT DISTINCT k.key_idx, g.id, g.query, g.impressions, g.clicks, g.ctr, g.position
+                FROM unnest(%s::int[], %s::text[]) AS k(key_idx, pattern)
+                JOIN raw_gsc_queries g ON g.query ILIKE k.pattern
+            ) m
+            GROUP BY m.key_idx, m.query
+        ) ranked
+        WHERE rn <= %s
+        ORDER BY key_idx, rn
+    """, (key_indexes, patterns, limit))
+    for key_idx, *row in cur.fetchall():
+        matches[keys[key_idx]].append(tuple(row))
+    return matches
+
+def fetch_serp_matches(cur, keywords_by_key: Dict[Any, List[str]]) -> Dict[Any, Optional[tuple]]:
+    """
+    여러 키워드 묶음의 연관 SERP AIO를 한 번의 조회로 가져오기
+    
+    Returns:
+        {key: (query, aio_text, cited_sources_json, snapshot_at) 또는 None} (묶음별 가장 최근 1건)
+    """
+    matches = {key: None for key in keywords_by_key}
+    keys, key_indexes, patterns = _keyword_patterns(keywords_by_key)
+    if not patterns:
+        return matches
+    
+    # 묶음별 최신 스냅샷 1건만 SQL에서 선택
+    cur.execute("""
+        SELECT DISTINCT ON (k.key_idx) k.key_idx, s.query, s.aio_text, s.cited_sources_json, s.snapshot_at
+        FROM unnest(%s::int[], %s::text[]) AS k(key_idx, pattern)
+        JOIN raw_serp_aio s ON s.query ILIKE k.pattern
+        ORDER BY k.key_idx, s.snapshot_at DESC
+    """, (key_indexes, patterns))
+    for key_idx, *row in cur.fetchall():
+        matches[keys[key_idx]] = tuple(row)
+    return matches
+
+def prefetch_brief_inputs(cluster_ids: List[int], run_id: int, conn=None) -> Dict[int, Dict[str, Any]]:
+    """
+    brief 생성용 클러스터별 키워드 + GSC/SERP 매칭을 한 번에 준비 (reuses conn when given)
+    
+    GSC/SERP/근거 포스트 조회는 클러스터 수와 무관하게 각 1회 (프롬프트용/근거 자료용 키워드 묶음 공용)
+    
+    Returns:
+        {cluster_id: {"keywords", "gsc", "serp", "source_keywords",
+                      "evidence_posts", "evidence_gsc", "evidence_serp"}}
+    """
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_db_connection()
+    
+    try:
+        with conn.cursor() as cur:
+            # TF-IDF 특징어 (프롬프트용)
+            keywords = extract_keywords_for_clusters(cluster_ids, run_id, conn=conn)
+            
+            # 클러스터 포스트의 수집 키워드 (근거 자료 GSC/SERP 매칭용, 클러스터당 최대 5개)
+            # 클러스터당 한 행으로 집계 (DISTINCT 정렬 후 앞 5개를 SQL에서 자름)
+            cur.execute("""
+                SELECT ca.cluster_id,
+                       (array_agg(DISTINCT rp.keyword ORDER BY rp.keyword))[1:5] AS keywords
+                FROM raw_reddit_posts rp
+                JOIN cluster_assignments ca ON ca.doc_id = rp.reddit_post_id
+                WHERE ca.cluster_id = ANY(%s)
+                AND ca.created_from_run_id = %s
+                AND rp.keyword IS NOT NULL AND rp.keyword <> ''
+                GROUP BY ca.cluster_id
+            """, (list(cluster_ids), run_id))
+            source_keywords = {cluster_id: [] for cluster_id in cluster_ids}
+            source_keywords.update(cur.fetchall())
+            
+            # 근거 자료용 상위 포스트 (클러스터당 업보트 상위 5개) + 포스트당 Top 3 댓글
+            # json 컬럼은 psycopg2가 list[dict]로 디코딩
+            cur.execute("""
+                SELECT ranked.cluster_id, ranked.reddit_post_id, ranked.title, ranked.body,
+                       ranked.upvotes, ranked.permalink, ranked.url, ranked.keyword,
+                       (SELECT json_agg(c ORDER BY c.upvotes DESC)
+                        FROM (
+                            SELECT rc.body, rc.upvotes, rc.author
+                            FROM raw_reddit_comments rc
+                            WHERE rc.reddit_post_id = ranked.reddit_post_id
+                            AND rc.is_top = TRUE
+                            ORDER BY rc.upvotes DESC
+                            LIMIT 3
+                        ) c) AS top_comments
+                FROM (
+                    SELECT ca.cluster_id, rp.reddit_post_id, rp.title, rp.body, rp.upvotes,
+                           rp.permalink, rp.url, rp.keyword,
+                           ROW_NUMBER() OVER (PARTITION BY ca.cluster_id ORDER BY rp.upvotes DESC) AS rn
+                    FROM raw_reddit_posts rp
+                    JOIN cluster_assignments ca ON ca.doc_id = rp.reddit_post_id
+                    WHERE ca.cluster_id = ANY(%s)
+                    AND ca.created_from_run_id = %s
+                ) ranked
+                WHERE ranked.rn <= 5
+                ORDER BY ranked.cluster_id, ranked.rn
+            """, (list(cluster_ids), run_id))
+            evidence_posts = {cluster_id: [] for cluster_id in cluster_ids}
+            for row in cur.fetchall():
+                evidence_posts[row[0]].append(row[1:])
+            
+            gsc = fetch_gsc_matches(cur, {
+                **{("prompt", cid): keywords[cid][:10] for cid in cluster_ids},
+                **{("evidence", cid): source_keywords[cid] for cid in cluster_ids},
+            })
+            serp = fetch_serp_matches(cur, {
+                **{("prompt", cid): keywords[cid][:5] for cid in cluster_ids},
+                **{("evidence", cid): source_keywords[cid][:3] for cid in cluster_ids},
+            })
+    finally:
+        if owns_conn:
+            put_db_connection(conn)
+    
+    return {
+        cid: {
+            "keywords": keywords[cid],
+            "gsc": gsc[("prompt", cid)],
+            "serp": serp[("prompt", cid)],
+            "source_keywords": source_keywords[cid],
+            "evidence_posts": evidence_posts[cid],
+            "evidence_gsc": gsc[("evidence", cid)],
+            "evidence_serp": serp[("evidence", cid)],
+        }
+        for cid in cluster_ids
+    }
+
+# 단일 클러스터 프롬프트 머리말 (build_cluster_context 결과 앞에 붙임)
+_SINGLE_CLUSTER_PROMPT = "Analyze this cluster of Reddit posts about kitchen lifestyle topics.\n\n"
+
+def build_llm_prompt(cluster_id: int, run_id: int, inputs: Optional[Dict[str, Any]] = None,
+                     conn=None) -> str:
     """Build LLM prompt from cluster data (대표 샘플 + 특징어 + 트렌드 + GSC + SERP AIO)"""
-    conn = get_db_connection()
+    return _SINGLE_CLUSTER_PROMPT + build_cluster_context(cluster_id, run_id, inputs, conn=conn)
+
+def build_batched_llm_prompt(cluster_contexts: List[str]) -> str:
+    """Build one prompt covering several clusters (brief 하나씩, 입력 순서대로 반환 요청)"""
+    prompt = (
+        f"Analyze each of the following {len(cluster_contexts)} clusters of Reddit posts "
+        f"about kitchen lifestyle topics independently and return exactly {len(cluster_contexts)} briefs.\n\n"
+    )
+    for i, context in enumerate(cluster_contexts, 1):
+        prompt += f"=== Cluster {i} ===\n{context}\n"
+    return prompt
+
+def build_cluster_context(cluster_id: int, run_id: int, inputs: Optional[Dict[str, Any]] = None,
+                          conn=None) -> str:
+    """
+    Cluster data block for prompts (대표 샘플 + 특징어 + 트렌드 + GSC + SERP AIO, reuses conn when given)
+    
+    inputs: prefetch_brief_inputs 결과 중 이 클러스터 항목 (None이면 여기서 조회)
+    """
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_db_connection()
     
     try:
         with conn.cursor() as cur:
@@ -34,8 +292,10 @@ def build_llm_prompt(cluster_id: int, run_id: int) -> str:
             
             samples = cur.fetchall()
             
-            # Get keywords (top 10-15)
-            keywords = extract_keywords_for_cluster(cluster_id, run_id)
+            # Keywords (top 10-15) + GSC/SERP matches
+            if inputs is None:
+                inputs = prefetch_brief_inputs([cluster_id], run_id, conn=conn)[cluster_id]
+            keywords = inputs["keywords"]
             
             # Get monthly trends (최근 3개월)
             cur.execute("""
@@ -49,39 +309,14 @@ def build_llm_prompt(cluster_id: int, run_id: int) -> str:
             
             trends = cur.fetchall()
             
-            # Get GSC data (연관 키워드 상위 N개)
-            # 클러스터의 키워드와 관련된 GSC 쿼리 찾기
-            cluster_keywords_str = "|".join(keywords[:10])
-            cur.execute("""
-                SELECT query, SUM(impressions) as total_impressions, 
-                       SUM(clicks) as total_clicks, AVG(ctr) as avg_ctr
-                FROM raw_gsc_queries
-                WHERE query ILIKE ANY(ARRAY[%s])
-                GROUP BY query
-                ORDER BY total_impressions DESC
-                LIMIT 10
-            """, ([f"%{kw}%" for kw in keywords[:10]],))
-            
-            gsc_data = cur.fetchall()
-            
-            # Get SERP AIO (관련 키워드의 AI Overview)
-            cur.execute("""
-                SELECT query, aio_text, cited_sources_json
-                FROM raw_serp_aio
-                WHERE query ILIKE ANY(ARRAY[%s])
-                ORDER BY snapshot_at DESC
-                LIMIT 1
-            """, ([f"%{kw}%" for kw in keywords[:5]],))
-            
-            serp_aio = cur.fetchone()
+            # GSC data (연관 키워드 상위 N개) / SERP AIO (관련 키워드의 AI Overview)
+            gsc_data = inputs["gsc"]
+            serp_aio = inputs["serp"]
             
-            # Build prompt (토큰 최소화)
-            prompt = f"""Analyze this cluster of Reddit posts about kitchen lifestyle topics.
-
-Representative Posts (3-5 samples):
-"""
+            # Build context (토큰 최소화)
+            prompt = "Representative Posts (3-5 samples):\n"
             for i, (title, body, upvotes, permalink, keyword) in enumerate(samples, 1):
-                body_summary = body[:150] + "..." if body and len(body) > 150 else (body or "")
+                body_summary = _truncate_tokens(body, _SAMPLE_BODY_TOKENS)
                 prompt += f"{i}. [{keyword}] {title}\n   {body_summary}\n   Upvotes: {upvotes}\n\n"
             
             prompt += f"\nKey Keywords (top 15): {', '.join(keywords[:15])}\n\n"
@@ -94,35 +329,53 @@ Representative Posts (3-5 samples):
             
             if gsc_data:
                 prompt += "Google Search Console (Top queries):\n"
-                for query, impressions, clicks, ctr in gsc_data[:5]:
+                for query, impressions, clicks, ctr, _ in gsc_data[:5]:
                     prompt += f"- '{query}': {impressions} impressions, {clicks} clicks, {ctr:.2%} CTR\n"
                 prompt += "\n"
             
             if serp_aio:
-                query, aio_text, cited_sources = serp_aio
+                query, aio_text, cited_sources, _ = serp_aio
                 prompt += f"SERP AI Overview (query: '{query}'):\n"
-                prompt += f"{aio_text[:300]}...\n\n"
+                prompt += f"{_truncate_tokens(aio_text, _SERP_AIO_TOKENS)}\n\n"
             
-            prompt += """
-Provide a JSON response with this structure:
-{
-  "category": "One of: SPRING_RECIPES, SPRING_KITCHEN_STYLING, REFRIGERATOR_ORGANIZATION, VEGETABLE_PREP_HANDLING",
-  "topic_title": "Topic title in Korean (max 500 chars)",
-  "primary_question": "Primary question in Korean",
-  "related_questions": ["Question 1", "Question 2", ...],
-  "blog_angle": "Blog content angle in Korean",
-  "social_angle": "Social media content angle in Korean",
-  "why_now": {"reason": "...", "trend": "..."},
-  "evidence_summary": "Summary of evidence in Korean"
-}
-"""
             return prompt
     
     finally:
-        conn.close()
+        if owns_conn:
+            put_db_connection(conn)
 
 def call_llm(prompt: str, client: OpenAI) -> Dict[str, Any]:
     """Call LLM with retry logic (최대 2회 재시도)"""
+    # Validate with Pydantic (JSON 파싱과 검증을 한 번에)
+    return _call_llm_validated(prompt, client, lambda content: TopicQABrief.model_validate_json(content).model_dump())
+
+def call_llm_batch(prompt: str, client: OpenAI, expected: int) -> List[Dict[str, Any]]:
+    """Call LLM for a batched prompt; brief 수가 expected와 다르면 재시도 대상 오류"""
+    def _parse(content: str) -> List[Dict[str, Any]]:
+        briefs = BatchedBriefs.model_validate_json(content).briefs
+        if len(briefs) != expected:
+            raise ValueError(f"Expected {expected} briefs, got {len(briefs)}")
+        return [brief.model_dump() for brief in briefs]
+    
+    return _call_llm_validated(prompt, client, _parse)
+
+# 재시도 대기 상한 (초)
+_LLM_MAX_BACKOFF = 30.0
+
+def _llm_retry_wait(error: Exception, attempt: int) -> float:
+    """Seconds to wait before the next LLM attempt (Retry-After on 429, otherwise jittered exponential)"""
+    if isinstance(error, RateLimitError):
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            return min(float(retry_after), _LLM_MAX_BACKOFF) + random.uniform(0, 0.5)
+        except (TypeError, ValueError):
+            pass  # 헤더 없음 또는 HTTP-date 형식: 지수 백오프로 대체
+    # 동시 워커들이 같은 시점에 재시도하지 않도록 0.5~1.5배 jitter 적용
+    return min((2 ** attempt) * (0.5 + random.random()), _LLM_MAX_BACKOFF)
+
+def _call_llm_validated(prompt: str, client: OpenAI, parse) -> Any:
+    """JSON 모드 LLM 호출 + parse(응답 JSON 문자열) 검증 (응답 검증 실패도 재시도, 최대 LLM_MAX_RETRIES회)"""
     max_attempts = LLM_MAX_RETRIES + 1  # 초기 시도 + 재시도 횟수
     
     for attempt in range(max_attempts):
@@ -130,31 +383,41 @@ def call_llm(prompt: str, client: OpenAI) -> Dict[str, Any]:
             response = client.chat.completions.create(
                 model=LLM_MODEL,
                 messages=[
-                    {"role": "system", "content": "You are a content strategist analyzing kitchen lifestyle topics. Always respond with valid JSON only."},
+                    {"role": "system", "content": _SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=LLM_TEMPERATURE,
                 response_format={"type": "json_object"}
             )
             
-            result = json.loads(response.choices[0].message.content)
+            # Prompt cache hits show up as cached_tokens once the shared prefix is long enough
+            usage = response.usage
+            if usage is not None:
+                details = getattr(usage, "prompt_tokens_details", None)
+                logger.debug(f"LLM usage: {usage.prompt_tokens} prompt tokens "
+                             f"({getattr(details, 'cached_tokens', 0) or 0} cached), {usage.completion_tokens} completion")
             
-            # Validate with Pydantic
-            brief = TopicQABrief(**result)
-            return brief.model_dump()
+            return parse(response.choices[0].message.content)
         
         except Exception as e:
             if attempt < max_attempts - 1:
-                wait_time = 2 ** attempt
-                logger.warning(f"LLM call failed (attempt {attempt + 1}/{max_attempts}), retrying in {wait_time}s: {e}")
+                wait_time = _llm_retry_wait(e, attempt)
+                logger.warning(f"LLM call failed (attempt {attempt + 1}/{max_attempts}), retrying in {wait_time:.2f}s: {e}")
                 time.sleep(wait_time)
             else:
                 logger.error(f"LLM call failed after {max_attempts} attempts: {e}")
                 raise
 
-def build_evidence_pack(cluster_id: int, run_id: int) -> Dict[str, Any]:
-    """Build evidence pack for cluster (Reddit + GSC + SERP AIO)"""
-    conn = get_db_connection()
+def build_evidence_pack(cluster_id: int, run_id: int, inputs: Optional[Dict[str, Any]] = None,
+                        conn=None) -> Dict[str, Any]:
+    """
+    Build evidence pack for cluster (Reddit + GSC + SERP AIO, reuses conn when given)
+    
+    inputs: prefetch_brief_inputs 결과 중 이 클러스터 항목 (None이면 여기서 조회, 있으면 DB 조회 없음)
+    """
+    if inputs is None:
+        inputs = prefetch_brief_inputs([cluster_id], run_id, conn=conn)[cluster_id]
+    
     evidence = {
         "reddit_posts": [],
         "reddit_comments": [],
@@ -162,123 +425,61 @@ def build_evidence_pack(cluster_id: int, run_id: int) -> Dict[str, Any]:
         "serp_aio": None
     }
     
-    try:
-        with conn.cursor() as cur:
-            # Get top Reddit posts (3-5개, 제목/요약/링크/업보트)
-            cur.execute("""
-                SELECT rp.reddit_post_id, rp.title, rp.body, rp.upvotes, 
-                       rp.permalink, rp.url, rp.keyword
-                FROM raw_reddit_posts rp
-                JOIN cluster_assignments ca ON ca.doc_id = rp.reddit_post_id
-                WHERE ca.cluster_id = %s
-                AND ca.created_from_run_id = %s
-                ORDER BY rp.upvotes DESC
-                LIMIT 5
-            """, (cluster_id, run_id))
-            
-            post_ids = []
-            for post_id, title, body, upvotes, permalink, url, keyword in cur.fetchall():
-                post_ids.append(post_id)
-                evidence["reddit_posts"].append({
-                    "title": title,
-                    "summary": (body[:200] + "...") if body and len(body) > 200 else (body or ""),
-                    "link": f"https://reddit.com{permalink}" if permalink else (url or ""),
-                    "upvotes": upvotes,
-                    "keyword": keyword
-                })
-            
-            # Get top comments for representative posts (각 포스트당 Top 1-3)
-            if post_ids:
-                cur.execute("""
-                    SELECT rc.reddit_post_id, rc.body, rc.upvotes, rc.author
-                    FROM raw_reddit_comments rc
-                    WHERE rc.reddit_post_id = ANY(%s)
-                    AND rc.is_top = TRUE
-                    ORDER BY rc.reddit_post_id, rc.upvotes DESC
-                """, (post_ids,))
-                
-                comments_by_post = {}
-                for post_id, body, upvotes, author in cur.fetchall():
-                    if post_id not in comments_by_post:
-                        comments_by_post[post_id] = []
-                    if len(comments_by_post[post_id]) < 3:  # Top 3 per post
-                        comments_by_post[post_id].append({
-                            "body": (body[:150] + "...") if body and len(body) > 150 else (body or ""),
-                            "upvotes": upvotes,
-                            "author": author
-                        })
-                
-                evidence["reddit_comments"] = comments_by_post
-            
-            # Get GSC data (연관 키워드 상위 N개, 월별 impressions/clicks/ctr/position 요약)
-            # 클러스터의 키워드와 매칭되는 GSC 쿼리 찾기
-            cur.execute("""
-                SELECT DISTINCT keyword
-                FROM raw_reddit_posts rp
-                JOIN cluster_assignments ca ON ca.doc_id = rp.reddit_post_id
-                WHERE ca.cluster_id = %s
-                AND ca.created_from_run_id = %s
-                LIMIT 5
-            """, (cluster_id, run_id))
-            
-            cluster_keywords = [row[0] for row in cur.fetchall()]
-            
-            if cluster_keywords:
-                keywords_pattern = "|".join(cluster_keywords)
-                cur.execute("""
-                    SELECT query, 
-                           SUM(impressions) as total_impressions,
-                           SUM(clicks) as total_clicks,
-                           AVG(ctr) as avg_ctr,
-                           AVG(position) as avg_position
-                    FROM raw_gsc_queries
-                    WHERE query ILIKE ANY(ARRAY[%s])
-                    GROUP BY query
-                    ORDER BY total_impressions DESC
-                    LIMIT 10
-                """, ([f"%{kw}%" for kw in cluster_keywords],))
-                
-                gsc_queries = cur.fetchall()
-                evidence["gsc_data"] = {
-                    "top_queries": [
-                        {
-                            "query": q,
-                            "impressions": int(i),
-                            "clicks": int(c),
-                            "ctr": float(ctr) if ctr else 0.0,
-                            "avg_position": float(pos) if pos else None
-                        }
-                        for q, i, c, ctr, pos in gsc_queries
-                    ],
-                    "summary": {
-                        "total_queries": len(gsc_queries),
-                        "total_impressions": sum(int(i) for _, i, _, _, _ in gsc_queries),
-                        "total_clicks": sum(int(c) for _, _, c, _, _ in gsc_queries)
-                    }
+    # Top Reddit posts (3-5개, 제목/요약/링크/업보트) + 포스트당 Top 3 댓글
+    comments_by_post = {}
+    for post_id, title, body, upvotes, permalink, url, keyword, top_comments in inputs["evidence_posts"]:
+        evidence["reddit_posts"].append({
+            "title": title,
+            "summary": (body[:200] + "...") if body and len(body) > 200 else (body or ""),
+            "link": f"https://reddit.com{permalink}" if permalink else (url or ""),
+            "upvotes": upvotes,
+            "keyword": keyword
+        })
+        if top_comments:
+            comments_by_post[post_id] = [
+                {
+                    "body": (c["body"][:150] + "...") if c["body"] and len(c["body"]) > 150 else (c["body"] or ""),
+                    "upvotes": c["upvotes"],
+                    "author": c["author"]
                 }
-            
-            # Get SERP AIO (해당 카테고리/쿼리 묶음에 대한 참고)
-            if cluster_keywords:
-                cur.execute("""
-                    SELECT query, aio_text, cited_sources_json, snapshot_at
-                    FROM raw_serp_aio
-                    WHERE query ILIKE ANY(ARRAY[%s])
-                    ORDER BY snapshot_at DESC
-                    LIMIT 1
-                """, ([f"%{kw}%" for kw in cluster_keywords[:3]],))
-                
-                serp_result = cur.fetchone()
-                if serp_result:
-                    query, aio_text, cited_sources, snapshot_at = serp_result
-                    evidence["serp_aio"] = {
-                        "query": query,
-                        "aio_summary": (aio_text[:300] + "...") if aio_text and len(aio_text) > 300 else (aio_text or ""),
-                        "cited_sources": cited_sources if cited_sources else [],
-                        "snapshot_at": snapshot_at.isoformat() if snapshot_at else None
-                    }
+                for c in top_comments
+            ]
     
-    finally:
-        conn.close()
+    if evidence["reddit_posts"]:
+        evidence["reddit_comments"] = comments_by_post
+    
+    # GSC data (연관 키워드 상위 N개, 월별 impressions/clicks/ctr/position 요약)
+    # 클러스터의 키워드와 매칭되는 GSC 쿼리
+    if inputs["source_keywords"]:
+        gsc_queries = inputs["evidence_gsc"]
+        evidence["gsc_data"] = {
+            "top_queries": [
+                {
+                    "query": q,
+                    "impressions": int(i),
+                    "clicks": int(c),
+                    "ctr": float(ctr) if ctr else 0.0,
+                    "avg_position": float(pos) if pos else None
+                }
+                for q, i, c, ctr, pos in gsc_queries
+            ],
+            "summary": {
+                "total_queries": len(gsc_queries),
+                "total_impressions": sum(int(i) for _, i, _, _, _ in gsc_queries),
+                "total_clicks": sum(int(c) for _, _, c, _, _ in gsc_queries)
+            }
+        }
+        
+        # SERP AIO (해당 카테고리/쿼리 묶음에 대한 참고)
+        serp_result = inputs["evidence_serp"]
+        if serp_result:
+            query, aio_text, cited_sources, snapshot_at = serp_result
+            evidence["serp_aio"] = {
+                "query": query,
+                "aio_summary": (aio_text[:300] + "...") if aio_text and len(aio_text) > 300 else (aio_text or ""),
+                "cited_sources": cited_sources if cited_sources else [],
+                "snapshot_at": snapshot_at.isoformat() if snapshot_at else None
+            }
     
     return evidence
 
@@ -288,15 +489,40 @@ def generate_briefs(run_id: int, dry_run: bool = False) -> Dict[str, Any]:
     if not openai_key:
         raise ValueError("OPENAI_API_KEY not found in environment variables")
     
-    client = OpenAI(api_key=openai_key)
-    
-    conn = get_db_connection()
     stats = {
         "clusters_processed": 0,
         "briefs_created": 0,
         "errors": []
     }
     
+    if dry_run:
+        # Only 3 samples are logged: fetch those plus the target count, skip client setup and prefetch
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT cluster_id, size, COUNT(*) OVER ()
+                    FROM clusters
+                    WHERE created_from_run_id = %s
+                    AND noise_label = FALSE
+                    ORDER BY size DESC
+                    LIMIT 3
+                """, (run_id,))
+                samples = cur.fetchall()
+        finally:
+            put_db_connection(conn)
+        
+        target_count = min(samples[0][2], MAX_BRIEFS_TO_GENERATE) if samples else 0
+        logger.info(f"Generating briefs for {target_count} clusters")
+        for cluster_id, size, _ in samples:
+            logger.info(f"[DRY RUN] Would generate brief for cluster {cluster_id} (size: {size})")
+        stats["clusters_processed"] = target_count
+        return stats
+    
+    client = OpenAI(api_key=openai_key)
+    
+    # Fetch target clusters (+ prompt inputs), then release the connection before the (slow) LLM calls
+    conn = get_db_connection()
     try:
         with conn.cursor() as cur:
             # Get top clusters by size
@@ -310,47 +536,97 @@ def generate_briefs(run_id: int, dry_run: bool = False) -> Dict[str, Any]:
             """, (run_id, MAX_BRIEFS_TO_GENERATE))
             
             clusters = cur.fetchall()
-            logger.info(f"Generating briefs for {len(clusters)} clusters")
-            
-            for cluster_id, size in clusters:
+        
+        logger.info(f"Generating briefs for {len(clusters)} clusters")
+        
+        cluster_ids = [cluster_id for cluster_id, _ in clusters]
+        
+        # Keywords + GSC/SERP matches for every cluster up front (one GSC and one SERP query in total)
+        brief_inputs = prefetch_brief_inputs(cluster_ids, run_id, conn=conn)
+    finally:
+        put_db_connection(conn)
+    
+    def _save_brief(cluster_id: int, brief_data: Dict[str, Any], conn):
+        """Attach the evidence pack and upsert one brief"""
+        # Build evidence pack
+        evidence = build_evidence_pack(cluster_id, run_id, brief_inputs[cluster_id], conn=conn)
+        brief_data["evidence_pack"] = evidence
+        
+        # Save brief
+        upsert_topic_qa_brief(
+            brief_data=brief_data,
+            cluster_id=cluster_id,
+            model_name=LLM_MODEL,
+            model_version=LLM_MODEL_VERSION,
+            run_id=run_id,
+            conn=conn
+        )
+    
+    def _generate_group(cluster_ids: List[int]) -> List[tuple]:
+        """
+        One LLM call for a group of clusters (runs on a worker thread), returns (cluster_id, error)
+        
+        A pooled connection is checked out only for the prompt reads and again for the upserts,
+        never across the LLM calls (no idle-in-transaction backend held while waiting on the API).
+        """
+        results = []
+        contexts = {}
+        with pooled_conn() as conn:
+            for cluster_id in cluster_ids:
                 try:
-                    if dry_run:
-                        if stats["clusters_processed"] < 3:
-                            logger.info(f"[DRY RUN] Would generate brief for cluster {cluster_id} (size: {size})")
-                        stats["clusters_processed"] += 1
-                        continue
-                    
-                    # Build prompt
-                    prompt = build_llm_prompt(cluster_id, run_id)
-                    
-                    # Call LLM
-                    brief_data = call_llm(prompt, client)
-                    
-                    # Build evidence pack
-                    evidence = build_evidence_pack(cluster_id, run_id)
-                    brief_data["evidence_pack"] = evidence
-                    
-                    # Save brief
-                    upsert_topic_qa_brief(
-                        brief_data=brief_data,
-                        cluster_id=cluster_id,
-                        model_name=LLM_MODEL,
-                        model_version=LLM_MODEL_VERSION,
-                        run_id=run_id
+                    contexts[cluster_id] = build_cluster_context(
+                        cluster_id, run_id, brief_inputs[cluster_id], conn=conn
                     )
-                    
-                    stats["briefs_created"] += 1
-                    stats["clusters_processed"] += 1
-                    
-                    # Rate limiting
-                    time.sleep(1)
-                
                 except Exception as e:
-                    logger.error(f"Error generating brief for cluster {cluster_id}: {e}")
-                    stats["errors"].append(str(e))
+                    conn.rollback()
+                    results.append((cluster_id, e))
+        
+        ready = [cluster_id for cluster_id in cluster_ids if cluster_id in contexts]
+        briefs = None
+        if len(ready) > 1:
+            try:
+                briefs = call_llm_batch(
+                    build_batched_llm_prompt([contexts[cluster_id] for cluster_id in ready]), client, len(ready)
+                )
+            except Exception as e:
+                # Malformed/short batch output: fall back to one call per cluster
+                logger.warning(f"Batched brief call for clusters {ready} failed, generating individually: {e}")
+        
+        generated = []
+        for i, cluster_id in enumerate(ready):
+            try:
+                # Briefs come back in prompt order
+                generated.append((cluster_id, briefs[i] if briefs else call_llm(
+                    _SINGLE_CLUSTER_PROMPT + contexts[cluster_id], client
+                )))
+            except Exception as e:
+                results.append((cluster_id, e))
+        
+        if generated:
+            with pooled_conn() as conn:
+                for cluster_id, brief_data in generated:
+                    try:
+                        _save_brief(cluster_id, brief_data, conn)
+                        results.append((cluster_id, None))
+                    except Exception as e:
+                        # Clear an aborted transaction so the next cluster can reuse the connection
+                        conn.rollback()
+                        results.append((cluster_id, e))
+        return results
     
-    finally:
-        conn.close()
+    groups = [cluster_ids[i:i + LLM_BRIEFS_PER_CALL] for i in range(0, len(cluster_ids), LLM_BRIEFS_PER_CALL)]
+    
+    # Groups are independent; LLM_CONCURRENCY bounds in-flight requests (rate limiting)
+    with ThreadPoolExecutor(max_workers=LLM_CONCURRENCY) as executor:
+        futures = [executor.submit(_generate_group, group) for group in groups]
+        for future in as_completed(futures):
+            for cluster_id, error in future.result():
+                if error is not None:
+                    logger.error(f"Error generating brief for cluster {cluster_id}: {error}")
+                    stats["errors"].append(str(error))
+                    continue
+                stats["briefs_created"] += 1
+                stats["clusters_processed"] += 1
     
     logger.info(f"Brief generation completed: {stats['briefs_created']} briefs created")
     return stats
@@ -27,3 +27,7 @@ class TopicQABrief(BaseModel):
         if v not in valid_categories:
             raise ValueError(f"category must be one of {valid_categories}")
         return v
+
+class BatchedBriefs(BaseModel):
+    """LLM output schema for a batched prompt (one brief per cluster, in prompt order)"""
+    briefs: List[TopicQABrief] = Field(..., description="Briefs in the same order as the clusters in the prompt")
@@ -4,19 +4,33 @@ Data preprocessing: cleaning, filtering, deduplication
 import hashlib
 import re
 from typing import List, Dict, Any
-from .db import get_db_connection
+from .db import get_db_connection, put_db_connection
 from .logging import setup_logger
 
 logger = setup_logger("preprocess")
 
+# Precompiled cleaning patterns (clean_text runs per post/comment)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Question/How-to/idea patterns: title prefixes (cheap startswith) + phrases anywhere (one alternation)
+_QUESTION_PREFIXES = ('how', 'what', 'why', 'when', 'where', 'can', 'should', 'do', 'does', 'is', 'are')
+_VALID_PHRASE_RE = re.compile(
+    r'how to|ideas? for|tips? for|ways? to|looking for|need help',
+    re.IGNORECASE
+)
+# Longest phrase is "looking for" (11 chars): enough context to catch a phrase split across title/body
+_PHRASE_SPAN = 11
+
 def clean_text(text: str) -> str:
     """Clean text: remove HTML, normalize whitespace"""
     if not text:
         return ""
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
+    # Remove HTML tags (skip the pass entirely when there is no tag opener)
+    if '<' in text:
+        text = _HTML_TAG_RE.sub('', text)
     # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WHITESPACE_RE.sub(' ', text)
     return text.strip()
 
 def is_valid_content(title: str, body: str) -> bool:
@@ -26,24 +40,26 @@ def is_valid_content(title: str, body: str) -> bool:
     if not body or len(body) < 50:
         return False
     
-    # Check for question/How-to patterns
-    patterns = [
-        r'^(how|what|why|when|where|can|should|do|does|is|are)',
-        r'how to',
-        r'ideas? for',
-        r'tips? for',
-        r'ways? to',
-        r'looking for',
-        r'need help'
-    ]
-    
-    combined = f"{title} {body}".lower()
-    return any(re.search(pattern, combined) for pattern in patterns)
+    # Check for question/How-to patterns, cheapest first (no title+body concatenation)
+    if title[:6].lower().startswith(_QUESTION_PREFIXES):
+        return True
+    if _VALID_PHRASE_RE.search(title) or _VALID_PHRASE_RE.search(body):
+        return True
+    # Phrase spanning the title/body boundary (e.g. "... looking" + "for ...")
+    return _VALID_PHRASE_RE.search(f"{title[-_PHRASE_SPAN:]} {body[:_PHRASE_SPAN]}") is not None
 
 def get_text_hash(text: str) -> str:
     """Get SHA-256 hash of text"""
     return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
+def _dedup_key(text: str) -> bytes:
+    """
+    In-run duplicate key: 128-bit BLAKE2b digest bytes
+    
+    Only used for the local seen set; stored hashes (embeddings.text_hash) keep using get_text_hash
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
 def preprocess_reddit_posts(run_id: int, dry_run: bool = False) -> Dict[str, Any]:
     """Preprocess Reddit posts: clean, filter, deduplicate"""
     conn = get_db_connection()
@@ -56,24 +72,27 @@ def preprocess_reddit_posts(run_id: int, dry_run: bool = False) -> Dict[str, Any
     }
     
     try:
-        with conn.cursor() as cur:
+        # Server-side cursor: rows arrive in itersize chunks instead of one fetchall list
+        with conn.cursor(name="preprocess_posts") as cur:
+            cur.itersize = 5000
             # Get all raw posts
             cur.execute("""
                 SELECT reddit_post_id, title, body, keyword
                 FROM raw_reddit_posts
                 ORDER BY created_utc DESC
             """)
-            posts = cur.fetchall()
-            stats["total_posts"] = len(posts)
             
-            logger.info(f"Preprocessing {stats['total_posts']} Reddit posts")
+            logger.info("Preprocessing Reddit posts")
             
             seen_hashes = set()
             
-            for post_id, title, body, keyword in posts:
+            for post_id, title, body, keyword in cur:
+                stats["total_posts"] += 1
                 try:
-                    # Clean text
+                    # Clean text (skip the body pass when the title already fails the length gate)
                     clean_title = clean_text(title or "")
+                    if len(clean_title) < 10:
+                        continue
                     clean_body = clean_text(body or "")
                     
                     # Validate content
@@ -84,7 +103,7 @@ def preprocess_reddit_posts(run_id: int, dry_run: bool = False) -> Dict[str, Any
                     
                     # Check for duplicates
                     combined_text = f"{clean_title} {clean_body}"
-                    text_hash = get_text_hash(combined_text)
+                    text_hash = _dedup_key(combined_text)
                     
                     if text_hash in seen_hashes:
                         stats["duplicates_removed"] += 1
@@ -107,7 +126,7 @@ def preprocess_reddit_posts(run_id: int, dry_run: bool = False) -> Dict[str, Any
                     stats["errors"].append(str(e))
     
     finally:
-        conn.close()
+        put_db_connection(conn)
     
-    logger.info(f"Preprocessing completed: {stats['cleaned_posts']} posts cleaned")
+    logger.info(f"Preprocessing completed: {stats['cleaned_posts']} of {stats['total_posts']} posts cleaned")
     return stats
@@ -1,96 +1,88 @@
 """
 Scoring and trend status calculation
 """
+from collections import Counter
 from typing import Dict, Any
-from .db import get_db_connection
+from .db import get_db_connection, put_db_connection
 from .logging import setup_logger
 
 logger = setup_logger("scoring")
 
-def calculate_trend_status(cluster_id: int, run_id: int) -> str:
-    """Calculate trend status: Emerging, Competitive, Saturated, Niche"""
-    conn = get_db_connection()
-    
-    try:
-        with conn.cursor() as cur:
-            # Get recent trend data
-            cur.execute("""
-                SELECT reddit_post_count, reddit_weighted_score
-                FROM cluster_timeseries
-                WHERE cluster_id = %s
-                AND created_from_run_id = %s
+# Trend status per brief's cluster (Emerging, Competitive, Saturated, Niche) from its last 3 months:
+# recent = newest month, older = oldest of those months; fewer than 2 months -> Niche
+# The LATERAL lookup reads at most 3 rows per brief via idx_cluster_timeseries_run_cluster_month
+# (briefs cover only the top clusters, so the rest of the run's timeseries is never scanned)
+# Score: base 75, Emerging +15, Competitive +5
+_SCORED_BRIEFS_SQL = """
+    SELECT id, trend_status,
+           CASE trend_status
+               WHEN 'Emerging' THEN 90.0
+               WHEN 'Competitive' THEN 80.0
+               ELSE 75.0
+           END AS score
+    FROM (
+        SELECT b.id,
+               CASE
+                   WHEN t.months < 2 THEN 'Niche'
+                   WHEN t.recent_count > t.older_count * 1.2 THEN 'Emerging'
+                   WHEN t.recent_count < t.older_count * 0.8 THEN 'Saturated'
+                   ELSE 'Competitive'
+               END AS trend_status
+        FROM topic_qa_briefs b
+        CROSS JOIN LATERAL (
+            SELECT COUNT(*) AS months,
+                   MAX(reddit_post_count) FILTER (WHERE rn = 1) AS recent_count,
+                   (ARRAY_AGG(reddit_post_count ORDER BY rn DESC))[1] AS older_count
+            FROM (
+                SELECT reddit_post_count,
+                       ROW_NUMBER() OVER (ORDER BY month DESC) AS rn
+                FROM cluster_timeseries ts
+                WHERE ts.created_from_run_id = %(run_id)s
+                AND ts.cluster_id = b.cluster_id
                 ORDER BY month DESC
                 LIMIT 3
-            """, (cluster_id, run_id))
-            
-            trends = cur.fetchall()
-            
-            if not trends or len(trends) < 2:
-                return "Niche"
-            
-            # Simple trend calculation
-            recent_count = trends[0][0] if trends else 0
-            older_count = trends[-1][0] if len(trends) > 1 else 0
-            
-            if recent_count > older_count * 1.2:
-                return "Emerging"
-            elif recent_count < older_count * 0.8:
-                return "Saturated"
-            else:
-                return "Competitive"
-    
-    finally:
-        conn.close()
+            ) recent
+        ) t
+        WHERE b.created_from_run_id = %(run_id)s
+    ) statuses
+"""
 
 def calculate_scores(run_id: int, dry_run: bool = False) -> Dict[str, Any]:
-    """Calculate scores for all briefs"""
+    """Calculate scores for all briefs (one set-based UPDATE, trend status derived in SQL)"""
     conn = get_db_connection()
     stats = {
-        "briefs_scored": 0
+        "briefs_scored": 0,
+        "trend_status_counts": {}
     }
     
     try:
         with conn.cursor() as cur:
-            # Get all briefs
-            cur.execute("""
-                SELECT id, cluster_id
-                FROM topic_qa_briefs
-                WHERE created_from_run_id = %s
-            """, (run_id,))
-            
-            briefs = cur.fetchall()
-            logger.info(f"Calculating scores for {len(briefs)} briefs")
-            
-            for brief_id, cluster_id in briefs:
-                if dry_run:
-                    if stats["briefs_scored"] < 3:
-                        logger.info(f"[DRY RUN] Would calculate score for brief {brief_id}")
-                    stats["briefs_scored"] += 1
-                    continue
-                
-                # Calculate trend status
-                trend_status = calculate_trend_status(cluster_id, run_id)
+            if dry_run:
+                # Same scores the UPDATE would write, computed read-only in one query
+                cur.execute(_SCORED_BRIEFS_SQL, {"run_id": run_id})
                 
-                # Simple score calculation (could be more sophisticated)
-                score = 75.0  # Base score
-                if trend_status == "Emerging":
-                    score += 15.0
-                elif trend_status == "Competitive":
-                    score += 5.0
-                
-                # Update score
-                cur.execute("""
-                    UPDATE topic_qa_briefs
-                    SET score = %s
-                    WHERE id = %s
-                """, (score, brief_id))
-                
-                stats["briefs_scored"] += 1
-            
-            conn.commit()
+                briefs = cur.fetchall()
+                logger.info(f"Calculating scores for {len(briefs)} briefs")
+                for brief_id, trend_status, score in briefs[:3]:
+                    logger.info(f"[DRY RUN] Would set score {score} ({trend_status}) for brief {brief_id}")
+                stats["briefs_scored"] = len(briefs)
+                stats["trend_status_counts"] = dict(Counter(trend_status for _, trend_status, _ in briefs))
+            else:
+                cur.execute(f"""
+                    UPDATE topic_qa_briefs b
+                    SET score = scored.score
+                    FROM ({_SCORED_BRIEFS_SQL}) scored
+                    WHERE b.id = scored.id
+                    RETURNING scored.trend_status
+                """, {"run_id": run_id})
+                # Stats come back with the UPDATE itself (no follow-up SELECT)
+                trend_statuses = [trend_status for (trend_status,) in cur.fetchall()]
+                stats["briefs_scored"] = len(trend_statuses)
+                stats["trend_status_counts"] = dict(Counter(trend_statuses))
+                conn.commit()
     
     finally:
-        conn.close()
+        put_db_connection(conn)
     
-    logger.info(f"Scoring completed: {stats['briefs_scored']} briefs scored")
+    logger.info(f"Scoring completed: {stats['briefs_scored']} briefs scored {stats['trend_status_counts']}")
     return stats
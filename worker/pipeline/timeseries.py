@@ -3,13 +3,29 @@ Timeseries aggregation: monthly trends per cluster
 """
 from typing import Dict, Any
 from datetime import datetime, timedelta
-from .db import get_db_connection
+from .db import get_db_connection, put_db_connection, set_async_commit
 from .logging import setup_logger
 
 logger = setup_logger("timeseries")
 
+# Monthly post count / upvote sum for every non-noise cluster of a run, aggregated server-side
+_MONTHLY_AGGREGATE_SQL = """
+    SELECT 
+        ca.cluster_id,
+        DATE_TRUNC('month', TO_TIMESTAMP(rp.created_utc)) as month,
+        COUNT(*) as post_count,
+        COALESCE(SUM(rp.upvotes), 0) as total_upvotes
+    FROM raw_reddit_posts rp
+    JOIN cluster_assignments ca ON ca.doc_id = rp.reddit_post_id
+    JOIN clusters c ON c.cluster_id = ca.cluster_id
+        AND c.created_from_run_id = ca.created_from_run_id
+    WHERE ca.created_from_run_id = %(run_id)s
+    AND c.noise_label = FALSE
+    GROUP BY ca.cluster_id, month
+"""
+
 def generate_timeseries(run_id: int, dry_run: bool = False) -> Dict[str, Any]:
-    """Generate monthly timeseries data for clusters"""
+    """Generate monthly timeseries data for clusters (one INSERT … SELECT for the whole run)"""
     conn = get_db_connection()
     stats = {
         "clusters_processed": 0,
@@ -18,66 +34,51 @@ def generate_timeseries(run_id: int, dry_run: bool = False) -> Dict[str, Any]:
     
     try:
         with conn.cursor() as cur:
-            # Get all clusters
+            # Count clusters (the id list itself is never needed client-side)
             cur.execute("""
-                SELECT cluster_id
+                SELECT COUNT(*)
                 FROM clusters
                 WHERE created_from_run_id = %s
                 AND noise_label = FALSE
             """, (run_id,))
             
-            clusters = cur.fetchall()
-            logger.info(f"Generating timeseries for {len(clusters)} clusters")
+            cluster_count = cur.fetchone()[0]
+            logger.info(f"Generating timeseries for {cluster_count} clusters")
+            stats["clusters_processed"] = cluster_count
+            
+            if dry_run:
+                # Only two samples are logged: let the server stop after two clusters
+                cur.execute(f"""
+                    SELECT cluster_id, COUNT(*)
+                    FROM ({_MONTHLY_AGGREGATE_SQL}) monthly
+                    GROUP BY cluster_id
+                    LIMIT 2
+                """, {"run_id": run_id})
+                for cluster_id, months in cur.fetchall():
+                    logger.info(f"[DRY RUN] Cluster {cluster_id} timeseries: {months} months")
+                return stats
+            
+            # Aggregate and upsert every (cluster, month) in a single statement, committed once
+            # (derived from raw posts and rebuilt on rerun, so the commit need not wait for WAL fsync)
+            set_async_commit(cur)
+            cur.execute(f"""
+                INSERT INTO cluster_timeseries (
+                    cluster_id, month, reddit_post_count,
+                    reddit_weighted_score, created_from_run_id
+                )
+                SELECT cluster_id, month, post_count, total_upvotes, %(run_id)s
+                FROM ({_MONTHLY_AGGREGATE_SQL}) monthly
+                ON CONFLICT (cluster_id, month, created_from_run_id) DO UPDATE SET
+                    reddit_post_count = EXCLUDED.reddit_post_count,
+                    reddit_weighted_score = EXCLUDED.reddit_weighted_score,
+                    updated_at = CURRENT_TIMESTAMP
+            """, {"run_id": run_id})
+            stats["months_aggregated"] = cur.rowcount
             
-            for (cluster_id,) in clusters:
-                # Get posts in cluster with dates
-                cur.execute("""
-                    SELECT 
-                        DATE_TRUNC('month', TO_TIMESTAMP(rp.created_utc)) as month,
-                        COUNT(*) as post_count,
-                        AVG(rp.upvotes) as avg_upvotes,
-                        SUM(rp.upvotes) as total_upvotes
-                    FROM raw_reddit_posts rp
-                    JOIN cluster_assignments ca ON ca.doc_id = rp.reddit_post_id
-                    WHERE ca.cluster_id = %s
-                    AND ca.created_from_run_id = %s
-                    GROUP BY month
-                    ORDER BY month DESC
-                """, (cluster_id, run_id))
-                
-                monthly_data = cur.fetchall()
-                
-                if dry_run:
-                    if stats["clusters_processed"] < 2:
-                        logger.info(f"[DRY RUN] Cluster {cluster_id} timeseries: {len(monthly_data)} months")
-                    stats["clusters_processed"] += 1
-                    continue
-                
-                # Insert timeseries data
-                for month, post_count, avg_upvotes, total_upvotes in monthly_data:
-                    cur.execute("""
-                        INSERT INTO cluster_timeseries (
-                            cluster_id, month, reddit_post_count,
-                            reddit_weighted_score, created_from_run_id
-                        ) VALUES (%s, %s, %s, %s, %s)
-                        ON CONFLICT (cluster_id, month, created_from_run_id) DO UPDATE SET
-                            reddit_post_count = EXCLUDED.reddit_post_count,
-                            reddit_weighted_score = EXCLUDED.reddit_weighted_score,
-                            updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        cluster_id,
-                        month,
-                        int(post_count),
-                        float(total_upvotes or 0),
-                        run_id
-                    ))
-                    stats["months_aggregated"] += 1
-                
-                stats["clusters_processed"] += 1
-                conn.commit()
+            conn.commit()
     
     finally:
-        conn.close()
+        put_db_connection(conn)
     
     logger.info(f"Timeseries generation completed: {stats['months_aggregated']} month records created")
     return stats
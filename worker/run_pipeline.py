@@ -45,13 +45,16 @@ Options:
 """
 import argparse
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
 from pathlib import Path
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from worker.pipeline.db import create_pipeline_run, update_pipeline_run
+from worker.pipeline.db import create_pipeline_run, update_pipeline_run, close_connection_pool
 from worker.pipeline.logging import setup_logger
 from worker.pipeline.collect_reddit import collect_reddit_data
 from worker.pipeline.collect_serp_aio import collect_serp_aio
@@ -66,6 +69,24 @@ from worker.pipeline.scoring import calculate_scores
 
 logger = setup_logger("run_pipeline")
 
+def _timed(func):
+    """Log the wall-clock time of a mode function"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            logger.info(f"{func.__name__} finished in {time.perf_counter() - started:.1f}s")
+    return wrapper
+
+def _run_parallel(*steps):
+    """Run independent steps (func, *args) on worker threads, results in the given order"""
+    with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+        futures = [executor.submit(func, *args) for func, *args in steps]
+        return [future.result() for future in futures]
+
+@_timed
 def run_collect_mode(run_id: int, dry_run: bool = False):
     """Run data collection mode"""
     logger.info("=" * 60)
@@ -74,20 +95,21 @@ def run_collect_mode(run_id: int, dry_run: bool = False):
     
     stats = {}
     
-    # Collect Reddit data
-    logger.info("Starting Reddit collection...")
-    reddit_stats = collect_reddit_data(run_id, dry_run)
+    # Collect Reddit data + SERP AIO (independent sources, run concurrently)
+    logger.info("Starting Reddit and SERP AIO collection...")
+    reddit_stats, serp_stats = _run_parallel(
+        (collect_reddit_data, run_id, dry_run),
+        (collect_serp_aio, run_id, dry_run),
+    )
     stats["reddit"] = reddit_stats
     logger.info(f"Reddit collection: {reddit_stats['posts_collected']} posts, {reddit_stats['comments_collected']} comments")
     
-    # Collect SERP AIO
-    logger.info("Starting SERP AIO collection...")
-    serp_stats = collect_serp_aio(run_id, dry_run)
     stats["serp"] = serp_stats
     logger.info(f"SERP AIO collection: {serp_stats['aio_found']} AIO found")
     
     return stats
 
+@_timed
 def run_ingest_gsc_mode(run_id: int, csv_path: str, dry_run: bool = False):
     """Run GSC CSV ingestion mode"""
     logger.info("=" * 60)
@@ -103,6 +125,7 @@ def run_ingest_gsc_mode(run_id: int, csv_path: str, dry_run: bool = False):
     
     return stats
 
+@_timed
 def run_analyze_mode(run_id: int, dry_run: bool = False):
     """Run analysis mode"""
     logger.info("=" * 60)
@@ -129,20 +152,21 @@ def run_analyze_mode(run_id: int, dry_run: bool = False):
     stats["clustering"] = cluster_stats
     logger.info(f"Clustering: {cluster_stats['clusters_created']} clusters, {cluster_stats.get('noise_points', 0)} noise points")
     
-    # Extract keywords
-    logger.info("Starting keyword extraction...")
-    keyword_stats = extract_keywords_for_all_clusters(run_id, dry_run)
+    # Extract keywords + generate timeseries (both only depend on clustering, run concurrently)
+    logger.info("Starting keyword extraction and timeseries generation...")
+    keyword_stats, timeseries_stats = _run_parallel(
+        (extract_keywords_for_all_clusters, run_id, dry_run),
+        (generate_timeseries, run_id, dry_run),
+    )
     stats["keywords"] = keyword_stats
     logger.info(f"Keywords: {keyword_stats['keywords_extracted']} keywords extracted")
     
-    # Generate timeseries
-    logger.info("Starting timeseries generation...")
-    timeseries_stats = generate_timeseries(run_id, dry_run)
     stats["timeseries"] = timeseries_stats
     logger.info(f"Timeseries: {timeseries_stats['months_aggregated']} month records created")
     
     return stats
 
+@_timed
 def run_label_mode(run_id: int, dry_run: bool = False):
     """Run labeling mode"""
     logger.info("=" * 60)
@@ -161,10 +185,45 @@ def run_label_mode(run_id: int, dry_run: bool = False):
     
     return {"briefs": brief_stats, "scores": score_stats}
 
+@_timed
+def run_all_mode(run_id: int, csv_path: str = None, dry_run: bool = False):
+    """Run collect → ingest_gsc → analyze → label"""
+    logger.info("Running full pipeline (all modes)...")
+    
+    all_stats = {}
+    
+    # Collect (Reddit + SERP AIO) and ingest GSC (if CSV path provided) - no dependency, run concurrently
+    if csv_path:
+        all_stats["collect"], all_stats["ingest_gsc"] = _run_parallel(
+            (run_collect_mode, run_id, dry_run),
+            (run_ingest_gsc_mode, run_id, csv_path, dry_run),
+        )
+    else:
+        logger.warning("GSC CSV path not provided, skipping GSC ingestion")
+        all_stats["collect"] = run_collect_mode(run_id, dry_run)
+        all_stats["ingest_gsc"] = {"skipped": True, "message": "No --gsc-csv provided"}
+    
+    # Analyze (정제/임베딩/클러스터링/시계열)
+    all_stats["analyze"] = run_analyze_mode(run_id, dry_run)
+    
+    # Label (LLM 기반 brief 생성)
+    all_stats["label"] = run_label_mode(run_id, dry_run)
+    
+    return all_stats
+
+# --mode 값 → (run_id, args) 실행 함수
+MODES = {
+    "collect": lambda run_id, args: run_collect_mode(run_id, args.dry_run),
+    "ingest_gsc": lambda run_id, args: run_ingest_gsc_mode(run_id, args.gsc_csv, args.dry_run),
+    "analyze": lambda run_id, args: run_analyze_mode(run_id, args.dry_run),
+    "label": lambda run_id, args: run_label_mode(run_id, args.dry_run),
+    "all": lambda run_id, args: run_all_mode(run_id, args.gsc_csv, args.dry_run),
+}
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description="Kitchen Seasonal Content POC Pipeline")
-    parser.add_argument("--mode", choices=["collect", "ingest_gsc", "analyze", "label", "all"],
+    parser.add_argument("--mode", choices=list(MODES),
                        required=True, help="Execution mode")
     parser.add_argument("--dry-run", action="store_true", help="Dry run mode (no DB writes)")
     parser.add_argument("--gsc-csv", type=str, help="Path to GSC CSV file (required for ingest_gsc mode)")
@@ -180,44 +239,8 @@ def main():
         logger.info("*** DRY RUN MODE: No database writes will be performed ***")
     
     try:
-        # Execute based on mode
-        if args.mode == "collect":
-            stats = run_collect_mode(run_id, args.dry_run)
-        
-        elif args.mode == "ingest_gsc":
-            if not args.gsc_csv:
-                raise ValueError("--gsc-csv path is required for ingest_gsc mode")
-            stats = run_ingest_gsc_mode(run_id, args.gsc_csv, args.dry_run)
-        
-        elif args.mode == "analyze":
-            stats = run_analyze_mode(run_id, args.dry_run)
-        
-        elif args.mode == "label":
-            stats = run_label_mode(run_id, args.dry_run)
-        
-        elif args.mode == "all":
-            # Run all modes sequentially
-            logger.info("Running full pipeline (all modes)...")
-            
-            all_stats = {}
-            
-            # Collect (Reddit + SERP AIO)
-            all_stats["collect"] = run_collect_mode(run_id, args.dry_run)
-            
-            # Ingest GSC (if CSV path provided)
-            if args.gsc_csv:
-                all_stats["ingest_gsc"] = run_ingest_gsc_mode(run_id, args.gsc_csv, args.dry_run)
-            else:
-                logger.warning("GSC CSV path not provided, skipping GSC ingestion")
-                all_stats["ingest_gsc"] = {"skipped": True, "message": "No --gsc-csv provided"}
-            
-            # Analyze (정제/임베딩/클러스터링/시계열)
-            all_stats["analyze"] = run_analyze_mode(run_id, args.dry_run)
-            
-            # Label (LLM 기반 brief 생성)
-            all_stats["label"] = run_label_mode(run_id, args.dry_run)
-            
-            stats = all_stats
+        # Execute based on mode (ingest_gsc raises if --gsc-csv is missing)
+        stats = MODES[args.mode](run_id, args)
         
         # Update pipeline run as completed
         update_pipeline_run(run_id, "completed", metadata=stats)
@@ -227,6 +250,10 @@ def main():
         logger.error(f"Pipeline run failed: {e}", exc_info=True)
         update_pipeline_run(run_id, "failed", error_message=str(e))
         sys.exit(1)
+    
+    finally:
+        # 모든 단계가 같은 풀 연결을 재사용하므로 실행 종료 시 한 번만 정리
+        close_connection_pool()
 
 if __name__ == "__main__":
     main()